@@ -7,7 +7,24 @@ SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
-from emlab.site import build_site  # noqa: E402
+from emlab import registry  # noqa: E402
+from emlab.buildcache import DEFAULT_MAX_BYTES  # noqa: E402
+from emlab.profiling import BuildProfiler  # noqa: E402
+from emlab.site import parse_variants, write_site, write_variants  # noqa: E402
+
+
+def _module_list(text: str) -> list[str]:
+    try:
+        return registry.parse_names(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _variant_list(text: str) -> list[str]:
+    try:
+        return parse_variants(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
 
 
 def _parse_args() -> argparse.Namespace:
@@ -15,7 +32,21 @@ def _parse_args() -> argparse.Namespace:
     p.add_argument(
         "--out",
         default=None,
-        help="Output HTML path (default: repo_root/dist/emlab.html).",
+        help="Output HTML path (default: repo_root/dist/emlab.html); with --layout split, the output "
+        "directory (default: repo_root/dist/emlab/).",
+    )
+    p.add_argument(
+        "--variants",
+        type=_variant_list,
+        default=None,
+        metavar="A,B",
+        help="Write several variants (release, debug, no-ct) from one set of module builds, into "
+        "--out-dir as emlab.html / emlab-<variant>.html; overrides --mode and --out.",
+    )
+    p.add_argument(
+        "--out-dir",
+        default=None,
+        help="With --variants: output directory (default: repo_root/dist/).",
     )
     p.add_argument(
         "--mode",
@@ -23,22 +54,178 @@ def _parse_args() -> argparse.Namespace:
         choices=["release", "debug"],
         help="release=fully offline; debug=smaller html (may use CDN).",
     )
+    p.add_argument(
+        "--layout",
+        default="single",
+        choices=["single", "split"],
+        help="single=one self-contained HTML file; split=index.html + hashed assets + per-module chunks.",
+    )
     p.add_argument(
         "--no-ct",
         action="store_true",
-        help="Skip XCT/CT module (or avoid heavy CT deps).",
+        help="Skip XCT/CT module (or avoid heavy CT deps); same as --exclude xct_ct.",
+    )
+    p.add_argument(
+        "--only",
+        type=_module_list,
+        default=None,
+        metavar="A,B",
+        help="Build only these modules (comma-separated; others are not even imported).",
+    )
+    p.add_argument(
+        "--exclude",
+        type=_module_list,
+        default=[],
+        metavar="A,B",
+        help="Skip these modules (comma-separated).",
+    )
+    p.add_argument(
+        "--payload",
+        default="binary",
+        choices=["binary", "json"],
+        help="Module data encoding: binary=base64 typed arrays (default); json=plain number lists.",
+    )
+    p.add_argument(
+        "--compress-data",
+        action="store_true",
+        help="Deflate each module's data block (inflated in the page on first use).",
+    )
+    p.add_argument(
+        "--hydrate",
+        default="lazy",
+        choices=["lazy", "eager"],
+        help="lazy=init a module on first navigation (default); eager=init all modules at load.",
+    )
+    p.add_argument(
+        "--purge-after",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Plotly.purge a module's figures after it has been hidden this long (default: 0, never).",
+    )
+    p.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Build modules in N worker processes (0 = one per CPU; default: 1, serial).",
     )
-    return p.parse_args()
+    p.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rebuild every module instead of reusing cached bundles.",
+    )
+    p.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Module bundle cache directory (default: emlab/.cache/bundles).",
+    )
+    p.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Evict least recently used cache entries above this many MB (default: %(default)s).",
+    )
+    p.add_argument(
+        "--profile",
+        metavar="REPORT_JSON",
+        default=None,
+        help="Write a build report: per-module time, tracemalloc peak and output bytes.",
+    )
+    p.add_argument(
+        "--pstats",
+        metavar="DIR",
+        default=None,
+        help="With --profile: also dump a cProfile .pstats file per module into DIR.",
+    )
+    p.add_argument(
+        "--trace",
+        metavar="TRACE_JSON",
+        default=None,
+        help="With --profile: also write a Chrome trace-event file of the build phases.",
+    )
+    p.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running; rebuild only the edited module (full rebuild for shared code).",
+    )
+    args = p.parse_args()
+    if args.out_dir and not args.variants:
+        p.error("--out-dir needs --variants")
+    if args.variants and args.watch:
+        p.error("--variants cannot be combined with --watch")
+    return args
+
+
+def _max_rss_kb() -> int | None:
+    """Peak resident set size of this build process (None where `resource` is unavailable)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # bytes on macOS, KiB on Linux
 
 
 def main() -> None:
     args = _parse_args()
-    out_path = Path(args.out) if args.out else (ROOT.parent / "dist" / "emlab.html")
+    if args.out:
+        out_path = Path(args.out)
+    elif args.layout == "split":
+        out_path = ROOT.parent / "dist" / "emlab"
+    else:
+        out_path = ROOT.parent / "dist" / "emlab.html"
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    html = build_site(mode=args.mode, no_ct=args.no_ct)
-    out_path.write_text(html, encoding="utf-8")
-    print(f"Wrote {out_path}")
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = Path(args.cache_dir) if args.cache_dir else (ROOT / ".cache" / "bundles")
+
+    build_kwargs = dict(
+        mode=args.mode,
+        layout=args.layout,
+        no_ct=args.no_ct,
+        only=args.only,
+        exclude=args.exclude,
+        payload=args.payload,
+        compress=args.compress_data,
+        hydrate=args.hydrate,
+        purge_after=args.purge_after,
+        jobs=args.jobs,
+        cache_dir=cache_dir,
+        cache_max_bytes=args.cache_size * 1024 * 1024,
+    )
+    if args.watch:
+        from emlab.watch import watch
+
+        watch(out_path, **build_kwargs)
+        return
+
+    profiler = BuildProfiler(pstats_dir=args.pstats) if (args.profile or args.trace) else None
+    if args.variants:
+        del build_kwargs["mode"]
+        out_dir = Path(args.out_dir) if args.out_dir else ROOT.parent / "dist"
+        report = write_variants(out_dir, args.variants, **build_kwargs, profiler=profiler)
+        for name, v in report["variants"].items():
+            print(f"Wrote {v['path']} ({name})")
+        print(
+            f"{len(args.variants)} variants in {report['actual_s']:.2f}s; separate builds would take "
+            f"~{report['separate_s']:.2f}s (saved {report['saved_s']:.2f}s of module builds)"
+        )
+    else:
+        html_path = write_site(out_path, **build_kwargs, profiler=profiler)
+        print(f"Wrote {html_path}")
+
+    if profiler is not None:
+        profiler.section("memory")["ru_maxrss_kb"] = _max_rss_kb()
+        if not args.variants:
+            profiler.assets["html"] = html_path.stat().st_size
+        if args.profile:
+            profiler.write(args.profile)
+            print(f"Wrote {args.profile}")
+        if args.trace:
+            profiler.write_trace(args.trace)
+            print(f"Wrote {args.trace}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from emlab import plotlyjs  # noqa: E402
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Vendor a partial plotly.js bundle (at plotly.py's plotly.js version) from the CDN "
+        "into vendor/plotly/, for offline release builds. Builds never download anything themselves."
+    )
+    p.add_argument(
+        "bundle",
+        nargs="?",
+        default="cartesian",
+        choices=sorted(plotlyjs.PARTIAL_BUNDLES),
+        help="Partial bundle to fetch (default: cartesian, which covers every trace type EMLab uses).",
+    )
+    p.add_argument(
+        "--sha256",
+        required=True,
+        help="Expected sha256 (hex) of the .min.js file; the download is rejected if it differs.",
+    )
+    return p.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    try:
+        path = plotlyjs.fetch_bundle(args.bundle, args.sha256)
+    except (OSError, ValueError) as e:
+        sys.exit(f"fetch_plotly: {e}")
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
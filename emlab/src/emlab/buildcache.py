@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable
+
+# Distributions whose version can change what a module build produces.
+_DEP_DISTS = ("numpy", "scipy", "plotly")
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _dist_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "missing"
+
+
+def _hash_files(h: "hashlib._Hash", paths: list[Path], *, root: Path) -> None:
+    for path in sorted(paths):
+        h.update(path.relative_to(root).as_posix().encode("utf-8"))
+        h.update(b"\0")
+        h.update(path.read_bytes())
+        h.update(b"\0")
+
+
+class BuildCache:
+    """
+    Content-addressed on-disk cache of rendered module bundles.
+
+    Key = module source + shared emlab sources (everything outside `modules/`, i.e. `common/`
+    and the site renderer) + dependency versions + build options. Entries are pickles; the
+    least recently used ones are evicted once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, root: str | Path, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._shared: str | None = None
+
+    def _shared_digest(self) -> str:
+        if self._shared is None:
+            pkg = Path(__file__).resolve().parent
+            h = hashlib.sha256()
+            h.update(f"py{sys.version_info[0]}.{sys.version_info[1]}".encode("utf-8"))
+            for dist in _DEP_DISTS:
+                h.update(f"\0{dist}={_dist_version(dist)}".encode("utf-8"))
+            shared = [p for p in pkg.rglob("*.py") if "modules" not in p.relative_to(pkg).parts]
+            _hash_files(h, shared, root=pkg)
+            self._shared = h.hexdigest()
+        return self._shared
+
+    def key(self, builder: Callable[..., Any], options: dict[str, Any]) -> str:
+        module = sys.modules[builder.__module__]
+        src = Path(module.__file__ or "").resolve()
+        h = hashlib.sha256()
+        h.update(self._shared_digest().encode("ascii"))
+        h.update(f"\0{builder.__module__}.{builder.__qualname__}\0".encode("utf-8"))
+        h.update(src.read_bytes())
+        h.update(json.dumps(options, sort_keys=True, default=repr).encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.pkl"
+
+    def get(self, key: str) -> Any | None:
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # truncated/stale entry: drop it and rebuild
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        os.utime(path)  # mark as recently used for eviction
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        with tmp.open("wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits in `max_bytes`. Returns bytes freed."""
+        if not self.root.is_dir():
+            return 0
+        entries = []
+        for path in self.root.glob("*.pkl"):
+            st = path.stat()
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            freed += size
+        return freed
@@ -1,2 +1,2 @@
-__all__ = ["units", "physics", "grids", "htmlbits"]
+__all__ = ["units", "physics", "grids", "htmlbits", "figspec", "png"]
 
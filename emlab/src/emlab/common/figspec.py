@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import base64
+import json
+import zlib
+from functools import lru_cache
+from importlib import resources
+from typing import Any
+
+# Plain-dict stand-ins for the few `plotly.graph_objects` constructors the modules use.
+# `go.Figure` validates every property and copies every array on construction and again on
+# `to_plotly_json()`; these just build the `{data, layout}` spec that plotly.js consumes, doing
+# only the conversions plotly.py would (shorthands, named colorscales, ndarrays -> typed
+# arrays). The result is the same figure JSON (up to key order), except that a template stays
+# a name: the page ships each template once and resolves names when it creates the figures.
+# Arrays the module also ships in `data_payload` can be given as `ref("key", i, ...)` so they
+# are serialized once; the page swaps in the decoded payload array the same way.
+# Debug builds still run every spec through `go.Figure` (see `validate`), so typos surface
+# there instead of in the browser.
+
+# `heatmap(...)` draws z-matrices with at least this many cells as an image trace (a PNG made at
+# build time) instead of a heatmap trace.
+IMAGE_MIN_CELLS = 256 * 256
+
+# Property names that contain an underscore themselves (everything else with `_` is plotly's
+# "magic underscore" shorthand, `xaxis_title="t"` == `xaxis=dict(title="t")`).
+_UNDERSCORE_KEYS = frozenset({"plot_bgcolor", "paper_bgcolor", "error_x", "error_y", "error_z"})
+# numpy dtype -> plotly.js typed array code (`{"dtype", "bdata", "shape"}` specs)
+_DTYPES = {
+    "int8": "i1", "uint8": "u1", "int16": "i2", "uint16": "u2",
+    "int32": "i4", "uint32": "u4", "float32": "f4", "float64": "f8",
+}
+
+
+def _typed_array(arr: Any) -> Any:
+    """ndarray -> plotly.js typed array spec, as `go` objects emit them (plain list otherwise)."""
+    import numpy as np
+
+    arr = np.ascontiguousarray(arr)
+    if arr.dtype.kind in "iu" and arr.dtype.itemsize == 8 and arr.size:
+        lo, hi = arr.min(), arr.max()
+        for small in ("int8", "int16", "int32") if arr.dtype.kind == "i" else ("uint8", "uint16", "uint32"):
+            if np.iinfo(small).min <= lo and hi <= np.iinfo(small).max:
+                arr = arr.astype(small)
+                break
+    code = _DTYPES.get(str(arr.dtype))
+    if code is None or arr.size == 0:
+        return arr.tolist()
+    spec = {"dtype": code, "bdata": base64.b64encode(arr.astype(arr.dtype.newbyteorder("<"))).decode("ascii")}
+    if arr.ndim > 1:
+        spec["shape"] = ", ".join(map(str, arr.shape))
+    return spec
+
+
+@lru_cache(maxsize=None)
+def _colorscale(name: str) -> tuple[tuple[float, str], ...]:
+    """Named colorscale (`"Viridis"`, `"gray_r"`, ...) as evenly spaced `(position, color)` steps."""
+    from plotly.colors import get_colorscale
+
+    colors = [c for _, c in get_colorscale(name)]
+    return tuple((i / (len(colors) - 1), c) for i, c in enumerate(colors))
+
+
+@lru_cache(maxsize=None)
+def _palette(name: str) -> bytes:
+    """256 RGB triplets sampled from a named colorscale (what plotly.js would interpolate)."""
+    import numpy as np
+
+    steps = _colorscale(name)
+    rgb = []
+    for _, color in steps:
+        if color.startswith("#"):
+            rgb.append([int(color[i : i + 2], 16) for i in (1, 3, 5)])
+        else:
+            rgb.append([float(v) for v in color[color.index("(") + 1 : -1].split(",")[:3]])
+    pos = [p for p, _ in steps]
+    t = np.linspace(0.0, 1.0, 256)
+    channels = [np.interp(t, pos, [c[k] for c in rgb]) for k in range(3)]
+    return np.round(np.stack(channels, axis=1)).astype(np.uint8).tobytes()
+
+
+def _merge(props: dict[str, Any]) -> dict[str, Any]:
+    """Expand magic underscores and `title="..."` shorthands, recursively."""
+    out: dict[str, Any] = {}
+    for key, value in props.items():
+        if isinstance(value, dict):
+            value = _merge(value)
+        elif getattr(value, "ndim", 0) > 0:
+            value = _typed_array(value)
+        elif isinstance(value, (list, tuple)) and value and all(isinstance(v, dict) for v in value):
+            value = [_merge(v) for v in value]  # annotations, shapes
+        if key == "title" and isinstance(value, str):
+            value = {"text": value}
+        elif key == "colorscale" and isinstance(value, str):
+            value = [list(step) for step in _colorscale(value)]
+        if "_" in key.strip("_") and key not in _UNDERSCORE_KEYS:
+            head, rest = key.split("_", 1)
+            out[head] = _merge({**out.get(head, {}), rest: value})
+        elif isinstance(value, dict) and isinstance(out.get(key), dict):
+            out[key] = {**out[key], **value}
+        else:
+            out[key] = value
+    return out
+
+
+@lru_cache(maxsize=None)
+def _template_json(name: str) -> str:
+    return (resources.files("plotly") / "package_data" / "templates" / f"{name}.json").read_text("utf-8")
+
+
+def template(name: str) -> dict[str, Any]:
+    """A built-in plotly.py template (what `pio.templates[name]` holds), as a plain dict."""
+    return json.loads(_template_json(name))
+
+
+def ref(key: str, *index: int) -> dict[str, Any]:
+    """Stand-in for the array `data_payload[key][index[0]][index[1]]...` in a figure."""
+    return {"__ref__": [key, *index]}
+
+
+def resolve(fig: Any, payload: dict[str, Any]) -> Any:
+    """`fig` with every `ref(...)` replaced by the payload array it names (as `go` would emit it)."""
+    if isinstance(fig, dict):
+        if "__ref__" in fig:
+            value: Any = payload
+            try:
+                for k in fig["__ref__"]:
+                    value = value[k]
+            except (KeyError, IndexError, TypeError):
+                raise ValueError(f"ref{tuple(fig['__ref__'])} is not in data_payload") from None
+            return _typed_array(value) if getattr(value, "ndim", 0) > 0 else value
+        return {k: resolve(v, payload) for k, v in fig.items()}
+    if isinstance(fig, list):
+        return [resolve(v, payload) for v in fig]
+    return fig
+
+
+def Scatter(**props: Any) -> dict[str, Any]:
+    return {**_merge(props), "type": "scatter"}
+
+
+def Heatmap(**props: Any) -> dict[str, Any]:
+    return {**_merge(props), "type": "heatmap"}
+
+
+def heatmap(
+    z: Any,
+    *,
+    colorscale: str,
+    ref: dict[str, Any] | None = None,
+    image: bool | None = None,
+    zmid: float | None = None,
+    showscale: bool = True,
+    colorscales: tuple[str, ...] = (),
+    hover_digits: int = 3,
+    **props: Any,
+) -> list[dict[str, Any]]:
+    """
+    Traces for a z-matrix, for `Figure(data=...)`; update them with `emlabSetHeatmap` in JS.
+
+    Small matrices become a `Heatmap` (with `ref` in place of `z` when given). From
+    `IMAGE_MIN_CELLS` on (or with `image=True`) the matrix is colour-mapped to an 8-bit palette
+    PNG here and drawn as an image trace, with a transparent 1x2 heatmap carrying the colorbar;
+    hover values come from the same 8-bit indices, shipped deflated. `colorscales` names the other colorscales the
+    module JS may switch to. Image traces draw row 0 at the top unless the y axis has
+    `autorange=True`, so pass that in the layout to keep the heatmap orientation.
+    """
+    import numpy as np
+
+    if image is None:
+        image = np.size(z) >= IMAGE_MIN_CELLS
+    if not image:
+        extra = {} if zmid is None else {"zmid": zmid}
+        if not showscale:
+            extra["showscale"] = False
+        return [Heatmap(z=z if ref is None else ref, colorscale=colorscale, **extra, **props)]
+
+    from emlab.common import png
+
+    z = np.asarray(z, dtype=float)
+    lo, hi = float(np.min(z)), float(np.max(z))
+    if zmid is not None:
+        half = max(abs(lo - zmid), abs(hi - zmid))
+        lo, hi = zmid - half, zmid + half
+    scale = 255.0 / (hi - lo) if hi > lo else 0.0
+    index = np.round((z - lo) * scale).astype(np.uint8)
+    palette = np.frombuffer(_palette(colorscale), dtype=np.uint8).reshape(256, 3)
+    traces = [
+        {
+            "type": "image",
+            "source": png.data_uri(png.encode_indexed(index, palette)),
+            "x0": 0,
+            "dx": 1,
+            "y0": 0,
+            "dy": 1,
+            "hoverinfo": "x+y+text",
+            # read (and removed) by the page: see emlabInitImage
+            "meta": {
+                "emlabImage": {
+                    "colorscale": colorscale,
+                    "palettes": {
+                        name: base64.b64encode(_palette(name)).decode("ascii")
+                        for name in dict.fromkeys((colorscale, *colorscales))
+                    },
+                    "zmid": zmid,
+                    "lo": lo,
+                    "hi": hi,
+                    # the 8-bit indices again, for hover text (deflated: they compress like the PNG)
+                    "q": {"zlib": base64.b64encode(zlib.compress(index.tobytes(), 9)).decode("ascii"), "shape": list(index.shape)},
+                    "digits": hover_digits,
+                }
+            },
+        }
+    ]
+    if showscale:
+        colorbar_props = {k: v for k, v in props.items() if k.startswith("colorbar")}
+        traces.append(
+            Heatmap(
+                z=[[lo, hi]],
+                zmin=lo,
+                zmax=hi,
+                colorscale=colorscale,
+                opacity=0,
+                hoverinfo="skip",
+                **colorbar_props,
+            )
+        )
+    return traces
+
+
+def Layout(**props: Any) -> dict[str, Any]:
+    return _merge(props)
+
+
+def Figure(*, data: list[dict[str, Any]], layout: dict[str, Any]) -> dict[str, Any]:
+    return {"data": list(data), "layout": layout}
+
+
+def validate(fig: dict[str, Any]) -> None:
+    """Raise ValueError if plotly.py would reject the spec (unknown property, bad value, ...)."""
+    import plotly.graph_objects as go
+
+    go.Figure(fig)
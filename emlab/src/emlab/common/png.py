@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import base64
+import struct
+import zlib
+
+import numpy as np
+
+_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def encode_indexed(index: np.ndarray, palette: np.ndarray) -> bytes:
+    """
+    8-bit palette PNG: `index` (rows, cols) uint8 into `palette` (<=256, 3) uint8.
+
+    Row 0 of `index` is the top row of the picture. No filtering; zlib does the work.
+    """
+    index = np.ascontiguousarray(index, dtype=np.uint8)
+    palette = np.ascontiguousarray(palette, dtype=np.uint8)
+    rows, cols = index.shape
+    scanlines = np.zeros((rows, cols + 1), dtype=np.uint8)  # filter type 0 per row
+    scanlines[:, 1:] = index
+    return (
+        _SIGNATURE
+        + _chunk(b"IHDR", struct.pack(">IIBBBBB", cols, rows, 8, 3, 0, 0, 0))
+        + _chunk(b"PLTE", palette.tobytes())
+        + _chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 9))
+        + _chunk(b"IEND", b"")
+    )
+
+
+def data_uri(png: bytes) -> str:
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
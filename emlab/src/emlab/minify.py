@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import re
+
+# Dependency-free, conservative minifiers for the code and markup we generate ourselves.
+# JS: comments, indentation and blank lines go; newlines are only dropped where automatic
+# semicolon insertion cannot be involved, and strings/template literals/regexes are copied
+# verbatim, so the output always parses the same way as the input.
+
+_WORD_CHAR = re.compile("[A-Za-z0-9_$\u0080-\uffff]")
+_WORD = re.compile("[A-Za-z0-9_$\u0080-\uffff]+")
+_PUNCTUATORS = sorted(
+    """>>>= ... === !== **= <<= >>= >>> &&= ||= ??= => == != <= >= && || ?? ++ -- += -= *= /= %=
+    &= |= ^= ** << >> ?.""".split(),
+    key=len,
+    reverse=True,
+)
+# After these keywords a `/` starts a regex literal, not a division.
+_REGEX_KEYWORDS = frozenset(
+    "return typeof case do else in of new delete void throw instanceof yield await".split()
+)
+# A statement can never end on these tokens, so a following newline is not needed for ASI.
+_JOIN_AFTER = frozenset(
+    "{ ( [ , ; : ? = == === != !== < > <= >= + - * / % ** & | ^ ! ~ && || ?? => += -= *= /= %= "
+    "**= <<= >>= >>>= &= |= ^= &&= ||= ??= << >> >>> ...".split()
+)
+# Nor can a newline before these tokens change the parse.
+_JOIN_BEFORE = frozenset(") ] } , ; . ? : ?.".split())
+
+
+def _skip_string(src: str, i: int) -> int:
+    """Index just past the string literal starting at `src[i]`."""
+    quote = src[i]
+    i += 1
+    while i < len(src) and src[i] != quote:
+        i += 2 if src[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_template(src: str, i: int) -> int:
+    """Index just past the template literal starting at `src[i]` (handles nested `${...}`)."""
+    i += 1
+    while i < len(src) and src[i] != "`":
+        if src[i] == "\\":
+            i += 2
+        elif src.startswith("${", i):
+            i = _skip_braces(src, i + 1)
+        else:
+            i += 1
+    return i + 1
+
+
+def _skip_braces(src: str, i: int) -> int:
+    """Index just past the `}` matching the `{` at `src[i]`."""
+    depth = 0
+    while i < len(src):
+        c = src[i]
+        if c in "'\"":
+            i = _skip_string(src, i)
+            continue
+        if c == "`":
+            i = _skip_template(src, i)
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _skip_regex(src: str, i: int) -> int:
+    """Index just past the regex literal (flags included) starting at `src[i]`; -1 if there is none."""
+    i += 1
+    in_class = False
+    while i < len(src):
+        c = src[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            break
+        elif c == "\n":
+            return -1
+        i += 1
+    if i >= len(src):
+        return -1
+    i += 1
+    m = _WORD.match(src, i)
+    return m.end() if m else i
+
+
+def _regex_allowed(prev: str) -> bool:
+    """Whether a `/` after token `prev` starts a regex literal (rather than a division)."""
+    if not prev or prev in _REGEX_KEYWORDS:
+        return True
+    return not _WORD_CHAR.match(prev[-1]) and prev[-1] not in ")]}'\"`"
+
+
+def _needs_space(prev: str, tok: str) -> bool:
+    a, b = prev[-1], tok[0]
+    if _WORD_CHAR.match(a) and _WORD_CHAR.match(b):
+        return True
+    # `a + +b`, `a - -b`, `x / /re/`
+    return (a == b and a in "+-/") or (a == "/" and b == "*")
+
+
+def minify_js(src: str) -> str:
+    out: list[str] = []
+    prev = ""  # last emitted token
+    space = newline = False
+    i, n = 0, len(src)
+
+    def emit(tok: str) -> None:
+        nonlocal prev, space, newline
+        if prev:
+            if newline and prev not in _JOIN_AFTER and tok not in _JOIN_BEFORE:
+                out.append("\n")
+            elif (space or newline) and _needs_space(prev, tok):
+                out.append(" ")
+        out.append(tok)
+        prev = tok
+        space = newline = False
+
+    while i < n:
+        c = src[i]
+        if c == "\n":
+            newline = True
+            i += 1
+        elif c.isspace():
+            space = True
+            i += 1
+        elif src.startswith("//", i):
+            j = src.find("\n", i)
+            i = n if j < 0 else j
+        elif src.startswith("/*", i):
+            j = src.find("*/", i + 2)
+            j = n if j < 0 else j + 2
+            if "\n" in src[i:j]:
+                newline = True
+            else:
+                space = True
+            i = j
+        elif c in "'\"":
+            j = _skip_string(src, i)
+            emit(src[i:j])
+            i = j
+        elif c == "`":
+            j = _skip_template(src, i)
+            emit(src[i:j])
+            i = j
+        elif c == "/" and _regex_allowed(prev) and (j := _skip_regex(src, i)) > 0:
+            emit(src[i:j])
+            i = j
+        elif _WORD_CHAR.match(c):
+            m = _WORD.match(src, i)
+            assert m is not None
+            emit(m.group())
+            i = m.end()
+        else:
+            for p in _PUNCTUATORS:
+                # `a?.5:b` is a conditional, not optional chaining
+                if src.startswith(p, i) and not (p == "?." and src[i + 2 : i + 3].isdigit()):
+                    emit(p)
+                    i += len(p)
+                    break
+            else:
+                emit(c)
+                i += 1
+    return "".join(out)
+
+
+def minify_css(src: str) -> str:
+    src = re.sub(r"/\*.*?\*/", "", src, flags=re.S)
+    src = re.sub(r"\s+", " ", src)
+    src = re.sub(r"\s*([{};,>])\s*", r"\1", src)
+    src = re.sub(r":\s+", ":", src)
+    return src.replace(";}", "}").strip()
+
+
+_BLOCK_TAGS = (
+    "address|article|aside|blockquote|br|details|div|dl|dd|dt|fieldset|figure|footer|form|"
+    "h[1-6]|header|hr|li|main|nav|ol|option|p|section|select|summary|table|tbody|td|th|thead|tr|ul"
+)
+_AFTER_BLOCK = re.compile(rf"(<(?:/?(?:{_BLOCK_TAGS}))\b[^>]*>)\s+", re.I)
+_BEFORE_BLOCK = re.compile(rf"\s+(</?(?:{_BLOCK_TAGS})\b)", re.I)
+
+
+def minify_html(src: str) -> str:
+    """
+    Collapse the indentation of generated markup (`emlab.common.htmlbits`, module texts).
+
+    Whitespace runs that contain a newline become one space; next to block-level tags they are
+    dropped, where they never render. Inline spacing (`<b>a</b> <i>b</i>`) is kept.
+    """
+    src = re.sub(r"[ \t]*\n\s*", " ", src)
+    src = _AFTER_BLOCK.sub(r"\1", src)
+    return _BEFORE_BLOCK.sub(r"\1", src).strip()
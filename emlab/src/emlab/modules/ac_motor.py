@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import plotly.graph_objects as go
-
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
@@ -87,11 +86,11 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="端点轨迹", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 0.5], y=[0, 0.2], mode="lines", name="合成磁场矢量", line=dict(color="#a6e22e", width=3)),
-            go.Scatter(
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="端点轨迹", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 0.5], y=[0, 0.2], mode="lines", name="合成磁场矢量", line=dict(color="#a6e22e", width=3)),
+            fs.Scatter(
                 x=[0.5],
                 y=[0.2],
                 mode="markers",
@@ -99,7 +98,7 @@ def build() -> dict:
                 marker=dict(size=10, color="#ff6b6b"),
                 showlegend=False,
             ),
-            go.Scatter(
+            fs.Scatter(
                 x=[0, 0],
                 y=[0, 0],
                 mode="lines",
@@ -107,7 +106,7 @@ def build() -> dict:
                 line=dict(color="#66d9ef", width=2, dash="dash"),
                 opacity=0.9,
             ),
-            go.Scatter(
+            fs.Scatter(
                 x=[0, 0],
                 y=[0, 0],
                 mode="lines",
@@ -115,7 +114,7 @@ def build() -> dict:
                 line=dict(color="#ffd166", width=2, dash="dash"),
                 opacity=0.9,
             ),
-            go.Scatter(
+            fs.Scatter(
                 x=[0, 0],
                 y=[0, 0],
                 mode="lines",
@@ -124,7 +123,7 @@ def build() -> dict:
                 opacity=0.9,
             ),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=50, r=20, t=40, b=45),
             title="旋转磁场：相分量(stick)叠加 → 合成矢量端点轨迹",
@@ -135,12 +134,12 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="I_a", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="|B|", line=dict(color="#a6e22e", width=2), yaxis="y2"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="I_a", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="|B|", line=dict(color="#a6e22e", width=2), yaxis="y2"),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="相电流（电路）与 |B|(电磁场) 随时间",
@@ -333,7 +332,7 @@ def build() -> dict:
         const allTraces = traces.concat(marks);
 
         const layout = {{
-          template:"plotly_dark",
+          template:emlabTemplate("plotly_dark"),
           margin:{{l:55,r:20,t:40,b:45}},
           title:"相电流（电路）与 |B|(电磁场) 随时间",
           xaxis:{{title:"t (ms)"}},
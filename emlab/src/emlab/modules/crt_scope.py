@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import numpy as np
-import plotly.graph_objects as go
 
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
@@ -161,12 +161,12 @@ def build() -> dict:
     )
 
     # figures
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 0.25], y=[0, 0], mode="lines", name="+A", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 0.25], y=[0, 0], mode="lines", name="-A", line=dict(color="#a6e22e", width=2)),
+            fs.Scatter(x=[0, 0.25], y=[0, 0], mode="lines", name="+A", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 0.25], y=[0, 0], mode="lines", name="-A", line=dict(color="#a6e22e", width=2)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=40, r=20, t=40, b=40),
             title="CRT 电子轨迹示意（偏转板内抛物线 + 漂移段直线，近似）",
@@ -187,11 +187,11 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="模拟(连续)", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines+markers", name="数字(采样/量化)", line=dict(color="#ff6b6b", width=1), marker=dict(size=5)),
-            go.Scatter(
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="模拟(连续)", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines+markers", name="数字(采样/量化)", line=dict(color="#ff6b6b", width=1), marker=dict(size=5)),
+            fs.Scatter(
                 x=[0, 1],
                 y=[0, 0],
                 mode="lines",
@@ -199,7 +199,7 @@ def build() -> dict:
                 line=dict(color="rgba(255,255,255,0.55)", width=1, dash="dot"),
             ),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="屏幕显示：Y-T（模拟 vs 数字采样）",
@@ -209,12 +209,12 @@ def build() -> dict:
         ),
     )
 
-    fig2 = go.Figure(
+    fig2 = fs.Figure(
         data=[
-            go.Scatter(x=[0], y=[0], mode="lines", name="模拟(连续)", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0], y=[0], mode="lines+markers", name="数字(采样/量化)", line=dict(color="#ff6b6b", width=1), marker=dict(size=4)),
+            fs.Scatter(x=[0], y=[0], mode="lines", name="模拟(连续)", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0], y=[0], mode="lines+markers", name="数字(采样/量化)", line=dict(color="#ff6b6b", width=1), marker=dict(size=4)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="屏幕显示：X-Y（李萨如）",
@@ -247,7 +247,7 @@ def build() -> dict:
     """
 
     data_payload = {
-        "noise": noise_base.tolist(),
+        "noise": noise_base.astype(np.float32),
         "defaults": {
             "Vacc": 3000,
             "mode": "yt",
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import plotly.graph_objects as go
-
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
@@ -86,9 +85,9 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
-        data=[go.Scatter(x=[0], y=[0], mode="lines", line=dict(color="#66d9ef", width=2), name="轨迹")],
-        layout=go.Layout(
+    fig0 = fs.Figure(
+        data=[fs.Scatter(x=[0], y=[0], mode="lines", line=dict(color="#66d9ef", width=2), name="轨迹")],
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=50, r=20, t=40, b=45),
             title="轨迹（螺旋外扩 / 失谐时变差）",
@@ -100,12 +99,12 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="K (keV)", line=dict(color="#a6e22e", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="相位(π)", line=dict(color="#ff6b6b", width=1.5), yaxis="y2"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="K (keV)", line=dict(color="#a6e22e", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="相位(π)", line=dict(color="#ff6b6b", width=1.5), yaxis="y2"),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="能量增长与相位（共振/失谐对比）",
@@ -3,8 +3,8 @@ from __future__ import annotations
 import math
 
 import numpy as np
-import plotly.graph_objects as go
 
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, slider
 from emlab.common.units import e, h, m_e
 
@@ -87,11 +87,11 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 0.2], y=[0, 0], mode="lines", name="束线", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 0.2], y=[0, 0], mode="lines", name="束线", line=dict(color="#66d9ef", width=2)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="束线追迹（薄透镜近似）：z 方向传播，y 方向偏离",
@@ -111,12 +111,12 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=v_curve.tolist(), y=lam_curve.tolist(), mode="lines", name="λ(V)", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[5000], y=[float(_lambda_pm(np.array([5000]))[0])], mode="markers", name="当前", marker=dict(size=10, color="#a6e22e")),
+            fs.Scatter(x=fs.ref("v_curve"), y=fs.ref("lam_curve"), mode="lines", name="λ(V)", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[5000], y=[float(_lambda_pm(np.array([5000]))[0])], mode="markers", name="当前", marker=dict(size=10, color="#a6e22e")),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="德布罗意波长 λ(V)（非相对论近似）",
@@ -146,8 +146,8 @@ def build() -> dict:
     """
 
     data_payload = {
-        "v_curve": v_curve.astype(float).tolist(),
-        "lam_curve": lam_curve.astype(float).tolist(),
+        "v_curve": v_curve.astype(float),
+        "lam_curve": lam_curve.astype(float),
         "defaults": {"V": 5000, "I": 1.2, "div": 12.0, "quality": 1.0},
     }
 
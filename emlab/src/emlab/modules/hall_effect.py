@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import plotly.graph_objects as go
-
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
@@ -51,12 +50,12 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 0.2], y=[0, 1], mode="lines", line=dict(color="#66d9ef", width=2), name="V_H(B)"),
-            go.Scatter(x=[0.08], y=[0.0], mode="markers", name="当前", marker=dict(size=10, color="#ff6b6b"), showlegend=False),
+            fs.Scatter(x=[0, 0.2], y=[0, 1], mode="lines", line=dict(color="#66d9ef", width=2), name="V_H(B)"),
+            fs.Scatter(x=[0.08], y=[0.0], mode="markers", name="当前", marker=dict(size=10, color="#ff6b6b"), showlegend=False),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="霍尔电压 V_H 随磁场 B 变化（其余参数固定）",
@@ -66,14 +65,14 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0.0, 1.0], y=[0.0, 0.0], mode="lines+markers", name="I", line=dict(color="#66d9ef", width=4), marker=dict(size=6)),
-            go.Scatter(x=[0.5, 0.5], y=[-0.6, 0.6], mode="lines+markers", name="F_L", line=dict(color="#ff6b6b", width=4), marker=dict(size=6)),
-            go.Scatter(x=[0.5], y=[0.8], mode="text", text=["B ⊙"], textfont=dict(size=18, color="rgba(255,255,255,0.85)"), name="B"),
-            go.Scatter(x=[0.5, 0.5], y=[0.0, 0.55], mode="lines+markers", name="E_H", line=dict(color="#a6e22e", width=4), marker=dict(size=6)),
+            fs.Scatter(x=[0.0, 1.0], y=[0.0, 0.0], mode="lines+markers", name="I", line=dict(color="#66d9ef", width=4), marker=dict(size=6)),
+            fs.Scatter(x=[0.5, 0.5], y=[-0.6, 0.6], mode="lines+markers", name="F_L", line=dict(color="#ff6b6b", width=4), marker=dict(size=6)),
+            fs.Scatter(x=[0.5], y=[0.8], mode="text", text=["B ⊙"], textfont=dict(size=18, color="rgba(255,255,255,0.85)"), name="B"),
+            fs.Scatter(x=[0.5, 0.5], y=[0.0, 0.55], mode="lines+markers", name="E_H", line=dict(color="#a6e22e", width=4), marker=dict(size=6)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=40, r=20, t=40, b=40),
             title="方向图：I、B、洛伦兹力与霍尔电场（示意）",
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import plotly.graph_objects as go
-
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, slider
 
 
@@ -52,12 +51,12 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0.5, 200], y=[10, 2], mode="lines", name="δ(f)", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[50], y=[3], mode="markers", name="当前", marker=dict(size=10, color="#ff6b6b")),
+            fs.Scatter(x=[0.5, 200], y=[10, 2], mode="lines", name="δ(f)", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[50], y=[3], mode="markers", name="当前", marker=dict(size=10, color="#ff6b6b")),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="集肤深度 δ vs 频率（教学近似）",
@@ -68,12 +67,12 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0.5, 200], y=[0.1, 0.8], mode="lines", name="P_rel(f)", line=dict(color="#a6e22e", width=2)),
-            go.Scatter(x=[50], y=[0.5], mode="markers", name="当前", marker=dict(size=10, color="#ff6b6b")),
+            fs.Scatter(x=[0.5, 200], y=[0.1, 0.8], mode="lines", name="P_rel(f)", line=dict(color="#a6e22e", width=2)),
+            fs.Scatter(x=[50], y=[0.5], mode="markers", name="当前", marker=dict(size=10, color="#ff6b6b")),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="相对加热功率指标 P_rel vs 频率（趋势演示）",
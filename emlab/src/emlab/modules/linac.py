@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import plotly.graph_objects as go
-
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
@@ -74,9 +73,9 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
-        data=[go.Scatter(x=[1, 2, 3], y=[0.02, 0.03, 0.05], mode="lines+markers", line=dict(color="#66d9ef", width=2))],
-        layout=go.Layout(
+    fig0 = fs.Figure(
+        data=[fs.Scatter(x=[1, 2, 3], y=[0.02, 0.03, 0.05], mode="lines+markers", line=dict(color="#66d9ef", width=2))],
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="漂移管长度随速度增长（示意）",
@@ -85,12 +84,12 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines+markers", name="K (keV)", line=dict(color="#a6e22e", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines+markers", name="到达相位/π", line=dict(color="#ff6b6b", width=1.5), yaxis="y2"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines+markers", name="K (keV)", line=dict(color="#a6e22e", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines+markers", name="到达相位/π", line=dict(color="#ff6b6b", width=1.5), yaxis="y2"),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="能量增长与相位同步（示意）",
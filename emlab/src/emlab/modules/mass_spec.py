@@ -2,8 +2,7 @@ from __future__ import annotations
 
 import math
 
-import plotly.graph_objects as go
-
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
@@ -89,14 +88,14 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0], y=[0], mode="lines", name="轨迹 A", line=dict(color="#66d9ef", width=3)),
-            go.Scatter(x=[0], y=[0], mode="markers", name="落点 A", marker=dict(size=10, color="#66d9ef"), showlegend=False),
-            go.Scatter(x=[0], y=[0], mode="lines", name="轨迹 B", line=dict(color="#a6e22e", width=3)),
-            go.Scatter(x=[0], y=[0], mode="markers", name="落点 B", marker=dict(size=10, color="#a6e22e"), showlegend=False),
+            fs.Scatter(x=[0], y=[0], mode="lines", name="轨迹 A", line=dict(color="#66d9ef", width=3)),
+            fs.Scatter(x=[0], y=[0], mode="markers", name="落点 A", marker=dict(size=10, color="#66d9ef"), showlegend=False),
+            fs.Scatter(x=[0], y=[0], mode="lines", name="轨迹 B", line=dict(color="#a6e22e", width=3)),
+            fs.Scatter(x=[0], y=[0], mode="markers", name="落点 B", marker=dict(size=10, color="#a6e22e"), showlegend=False),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=50, r=20, t=40, b=45),
             title="磁场中圆弧轨迹与探测屏落点（理想化）",
@@ -114,9 +113,9 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(
+            fs.Scatter(
                 x=[1, 2, 3],
                 y=[0, 1, 2],
                 mode="lines",
@@ -124,10 +123,10 @@ def build() -> dict:
                 line=dict(color="rgba(255,255,255,0.70)", width=1.5),
                 showlegend=False,
             ),
-            go.Scatter(x=[1], y=[0], mode="markers", name="粒子 A", marker=dict(size=10, color="#66d9ef")),
-            go.Scatter(x=[1], y=[0], mode="markers", name="粒子 B", marker=dict(size=10, color="#a6e22e")),
+            fs.Scatter(x=[1], y=[0], mode="markers", name="粒子 A", marker=dict(size=10, color="#66d9ef")),
+            fs.Scatter(x=[1], y=[0], mode="markers", name="粒子 B", marker=dict(size=10, color="#a6e22e")),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="落点位置 vs m/q（固定屏幕位置）",
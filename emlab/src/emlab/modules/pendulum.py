@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import numpy as np
-import plotly.graph_objects as go
 
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
@@ -235,12 +235,12 @@ def build() -> dict:
     )
 
     # Placeholder figures (JS will Plotly.react on init)
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 0], y=[0, -1], mode="lines", name="摆线", line=dict(color="#66d9ef", width=3)),
-            go.Scatter(x=[0], y=[-1], mode="markers", name="摆球", marker=dict(size=10, color="#a6e22e")),
+            fs.Scatter(x=[0, 0], y=[0, -1], mode="lines", name="摆线", line=dict(color="#66d9ef", width=3)),
+            fs.Scatter(x=[0], y=[-1], mode="markers", name="摆球", marker=dict(size=10, color="#a6e22e")),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             margin=dict(l=40, r=20, t=40, b=40),
             template="plotly_dark",
             title="单摆示意（平衡/初始）",
@@ -250,11 +250,11 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="θ(t)", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="θ(t)", line=dict(color="#66d9ef", width=2)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             margin=dict(l=50, r=20, t=40, b=40),
             template="plotly_dark",
             title="角度随时间变化 θ(t)",
@@ -263,12 +263,12 @@ def build() -> dict:
         ),
     )
 
-    fig2 = go.Figure(
+    fig2 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[1, 0.7], mode="lines", name="机械能(归一)", line=dict(color="#a6e22e", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0.3], mode="lines", name="耗散/热(归一)", line=dict(color="#ff6b6b", width=2)),
+            fs.Scatter(x=[0, 1], y=[1, 0.7], mode="lines", name="机械能(归一)", line=dict(color="#a6e22e", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0.3], mode="lines", name="耗散/热(归一)", line=dict(color="#ff6b6b", width=2)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             margin=dict(l=50, r=20, t=40, b=40),
             template="plotly_dark",
             title="能量观点（归一化）",
@@ -484,7 +484,7 @@ def build() -> dict:
             {{x:[xNow], y:[yNow], mode:"markers", marker:{{size:10, color:"#ffffff"}}, hoverinfo:"skip"}},
           ];
           const schemLayout = {{
-            template:"plotly_dark",
+            template:emlabTemplate("plotly_dark"),
             margin:{{l:40,r:20,t:40,b:40}},
             title:"单摆示意：支点(灰)、平衡(蓝)、初始(绿)、当前(白)",
             xaxis:{{range:[-1.2,1.2], showgrid:false, zeroline:false}},
@@ -498,7 +498,7 @@ def build() -> dict:
             {{x:[0,tMax], y:[deg(thetaEq), deg(thetaEq)], mode:"lines", name:"θ_eq", line:{{color:"#a6e22e", width:1, dash:"dash"}}}},
           ];
           const fig1Layout = {{
-            template:"plotly_dark",
+            template:emlabTemplate("plotly_dark"),
             margin:{{l:50,r:20,t:40,b:40}},
             title:"θ(t)：小角近似（绕平衡位置振动）",
             xaxis:{{title:"t (s)"}},
@@ -522,7 +522,7 @@ def build() -> dict:
             {{x:[V,V], y:[Math.min(...Ts), Math.max(...Ts)], mode:"lines", name:"当前V", line:{{color:"#ff6b6b", width:1, dash:"dot"}}}},
           ];
           const fig2Layout = {{
-            template:"plotly_dark",
+            template:emlabTemplate("plotly_dark"),
             margin:{{l:60,r:20,t:40,b:40}},
             title:"周期随电压变化 T(V)（保持 d、q/m、L 不变）",
             xaxis:{{title:"V (V)"}},
@@ -560,7 +560,7 @@ def build() -> dict:
             {{x:[x0], y:[y0], mode:"markers", marker:{{size:10, color:"#a6e22e"}}, hoverinfo:"skip"}},
           ];
           const schemLayout = {{
-            template:"plotly_dark",
+            template:emlabTemplate("plotly_dark"),
             margin:{{l:40,r:20,t:40,b:40}},
             title:"单摆示意：涡流阻尼（机械能→热）",
             xaxis:{{range:[-1.2,1.2], showgrid:false, zeroline:false}},
@@ -573,7 +573,7 @@ def build() -> dict:
             {{x:t, y:thDeg.map(v=>Math.abs(v)), mode:"lines", name:"|θ|", line:{{color:"#a6e22e", width:1, dash:"dot"}}}},
           ];
           const fig1Layout = {{
-            template:"plotly_dark",
+            template:emlabTemplate("plotly_dark"),
             margin:{{l:50,r:20,t:40,b:40}},
             title:"θ(t)：阻尼振动（定性模型）",
             xaxis:{{title:"t (s)"}},
@@ -597,7 +597,7 @@ def build() -> dict:
             {{x:t, y:Eh, mode:"lines", name:"热(归一)", line:{{color:"#ff6b6b", width:2}}}},
           ];
           const fig2Layout = {{
-            template:"plotly_dark",
+            template:emlabTemplate("plotly_dark"),
             margin:{{l:55,r:20,t:40,b:40}},
             title:"能量观点：机械能衰减 → 热增加（定性）",
             xaxis:{{title:"t (s)"}},
@@ -635,7 +635,7 @@ def build() -> dict:
             {{x:[Math.sin(th0)], y:[-Math.cos(th0)], mode:"markers", marker:{{size:10, color:"#a6e22e"}}, hoverinfo:"skip"}},
           ];
           const schemLayout = {{
-            template:"plotly_dark",
+            template:emlabTemplate("plotly_dark"),
             margin:{{l:40,r:20,t:40,b:40}},
             title:"单摆示意：磁铁单摆 + 线圈（负载改变阻尼）",
             xaxis:{{range:[-1.2,1.2], showgrid:false, zeroline:false}},
@@ -648,7 +648,7 @@ def build() -> dict:
             {{x:t, y:thL.map(v=>deg(v)), mode:"lines", name:"接负载(有阻尼)", line:{{color:"#66d9ef", width:2}}}},
           ];
           const fig1Layout = {{
-            template:"plotly_dark",
+            template:emlabTemplate("plotly_dark"),
             margin:{{l:50,r:20,t:40,b:40}},
             title:"θ(t)：R_load 变小 → 阻尼增强（定性）",
             xaxis:{{title:"t (s)"}},
@@ -668,7 +668,7 @@ def build() -> dict:
             {{x:t, y:iInd, mode:"lines", name:"感应电流指标 ~ θ'(t)/R", line:{{color:"#ff6b6b", width:2}}}},
           ];
           const fig2Layout = {{
-            template:"plotly_dark",
+            template:emlabTemplate("plotly_dark"),
             margin:{{l:55,r:20,t:40,b:40}},
             title:"电路观点：R 变小 → 电流变大 → 焦耳热增加（定性）",
             xaxis:{{title:"t (s)"}},
@@ -708,7 +708,7 @@ def build() -> dict:
           {{x:[Math.sin(th[0])], y:[-Math.cos(th[0])], mode:"markers", marker:{{size:10, color:"#a6e22e"}}, hoverinfo:"skip"}},
         ];
         const schemLayout = {{
-          template:"plotly_dark",
+          template:emlabTemplate("plotly_dark"),
           margin:{{l:40,r:20,t:40,b:40}},
           title:"单摆示意：电磁驱动（稳态响应近似）",
           xaxis:{{range:[-1.2,1.2], showgrid:false, zeroline:false}},
@@ -720,7 +720,7 @@ def build() -> dict:
           {{x:t, y:th.map(v=>deg(v)), mode:"lines", name:"θ(t) 稳态", line:{{color:"#66d9ef", width:2}}}},
         ];
         const fig1Layout = {{
-          template:"plotly_dark",
+          template:emlabTemplate("plotly_dark"),
           margin:{{l:50,r:20,t:40,b:40}},
           title:"θ(t)：受迫振动（稳态）",
           xaxis:{{title:"t (s)"}},
@@ -746,7 +746,7 @@ def build() -> dict:
           {{x:[f,f], y:[0, Math.max(...AScan)], mode:"lines", name:"当前 f", line:{{color:"#ff6b6b", width:1, dash:"dot"}}}},
         ];
         const fig2Layout = {{
-          template:"plotly_dark",
+          template:emlabTemplate("plotly_dark"),
           margin:{{l:60,r:20,t:40,b:40}},
           title:"共振曲线：稳态振幅 vs 驱动频率",
           xaxis:{{title:"f (Hz)"}},
@@ -3,8 +3,8 @@ from __future__ import annotations
 import math
 
 import numpy as np
-import plotly.graph_objects as go
 
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
@@ -60,13 +60,10 @@ def build() -> dict:
 
     wave_L: list[dict] = []
     for L in L_opts:
-        I_grid = []
-        for R in R_grid:
-            I_row = []
-            for C in C_grid:
-                i_n = _rlc_normalized_current(t=t, R=float(R), L=float(L), C=float(C))
-                I_row.append(i_n.tolist())
-            I_grid.append(I_row)
+        I_grid = np.empty((len(R_grid), len(C_grid), n_t), dtype=np.float32)
+        for i, R in enumerate(R_grid):
+            for j, C in enumerate(C_grid):
+                I_grid[i, j] = _rlc_normalized_current(t=t, R=float(R), L=float(L), C=float(C))
         wave_L.append({"I": I_grid})
 
     controls_html = "\n".join(
@@ -152,12 +149,12 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="I(t)", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="V_C(t)", line=dict(color="#a6e22e", width=2), yaxis="y2"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="I(t)", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="V_C(t)", line=dict(color="#a6e22e", width=2), yaxis="y2"),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="RLC 放电：电流 I(t) 与电容电压 Vc(t)",
@@ -168,12 +165,12 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="x(t)", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="v(t)", line=dict(color="#a6e22e", width=2), yaxis="y2"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="x(t)", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="v(t)", line=dict(color="#a6e22e", width=2), yaxis="y2"),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="运动学：位移 x(t) 与速度 v(t)（理想化）",
@@ -184,11 +181,11 @@ def build() -> dict:
         ),
     )
 
-    fig_force = go.Figure(
+    fig_force = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="F(t)", line=dict(color="#ff6b6b", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="F(t)", line=dict(color="#ff6b6b", width=2)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="电磁力（理想化）F(t) ≈ ½·L'·I²",
@@ -198,15 +195,15 @@ def build() -> dict:
         ),
     )
 
-    fig2 = go.Figure(
+    fig2 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_C", stackgroup="one", line=dict(width=0.5), fillcolor="rgba(102,217,239,0.35)"),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_L", stackgroup="one", line=dict(width=0.5), fillcolor="rgba(166,226,46,0.35)"),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_R(热)", stackgroup="one", line=dict(width=0.5), fillcolor="rgba(255,107,107,0.35)"),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_K(动能)", stackgroup="one", line=dict(width=0.5), fillcolor="rgba(255,255,255,0.25)"),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="摩擦损失", stackgroup="one", line=dict(width=0.5), fillcolor="rgba(255,255,255,0.12)"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_C", stackgroup="one", line=dict(width=0.5), fillcolor="rgba(102,217,239,0.35)"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_L", stackgroup="one", line=dict(width=0.5), fillcolor="rgba(166,226,46,0.35)"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_R(热)", stackgroup="one", line=dict(width=0.5), fillcolor="rgba(255,107,107,0.35)"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_K(动能)", stackgroup="one", line=dict(width=0.5), fillcolor="rgba(255,255,255,0.25)"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="摩擦损失", stackgroup="one", line=dict(width=0.5), fillcolor="rgba(255,255,255,0.12)"),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="能量条（随时间累加，理想化）",
@@ -237,10 +234,10 @@ def build() -> dict:
     """
 
     data_payload = {
-        "t": t.astype(float).tolist(),
+        "t": t.astype(float),
         "t_max": t_max,
-        "R_grid": R_grid.astype(float).tolist(),
-        "C_grid": C_grid.astype(float).tolist(),
+        "R_grid": R_grid.astype(float),
+        "C_grid": C_grid.astype(float),
         "L_opts_uH": [int(round(v * 1e6)) for v in L_opts],
         "wave": wave_L,
         "defaults": {
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import plotly.graph_objects as go
-
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, slider
 
 
@@ -30,12 +29,12 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="I(t)", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="V_C(t)", line=dict(color="#a6e22e", width=2), yaxis="y2"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="I(t)", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="V_C(t)", line=dict(color="#a6e22e", width=2), yaxis="y2"),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="RLC 放电：电流与电容电压",
@@ -46,13 +45,13 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_C", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_L", line=dict(color="#a6e22e", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_R(累积热)", line=dict(color="#ff6b6b", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_C", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_L", line=dict(color="#a6e22e", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="E_R(累积热)", line=dict(color="#ff6b6b", width=2)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="能量观点：C↔L 交换 + R 耗散",
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import plotly.graph_objects as go
-
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
@@ -87,12 +86,12 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="电信号", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="机械位移 x(t)", line=dict(color="#a6e22e", width=2), yaxis="y2"),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="电信号", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="机械位移 x(t)", line=dict(color="#a6e22e", width=2), yaxis="y2"),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="时间波形（两周期）：电 ↔ 机",
@@ -103,12 +102,12 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[20, 2000], y=[1, 2], mode="lines", name="幅频响应", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[200], y=[1.5], mode="markers", name="当前 f", marker=dict(size=10, color="#ff6b6b")),
+            fs.Scatter(x=[20, 2000], y=[1, 2], mode="lines", name="幅频响应", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[200], y=[1.5], mode="markers", name="当前 f", marker=dict(size=10, color="#ff6b6b")),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="幅频响应（共振）",
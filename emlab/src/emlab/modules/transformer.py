@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import plotly.graph_objects as go
-
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
@@ -68,12 +67,12 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
+    fig0 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="v_p(t)", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="v_s(t)", line=dict(color="#a6e22e", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="v_p(t)", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="v_s(t)", line=dict(color="#a6e22e", width=2)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="电压波形：原边 vs 副边（理想变压器）",
@@ -83,12 +82,12 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="i_p(t)", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="i_s(t)", line=dict(color="#a6e22e", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="i_p(t)", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="i_s(t)", line=dict(color="#a6e22e", width=2)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="电流波形：原边 vs 副边（相位/功率因数）",
@@ -98,9 +97,9 @@ def build() -> dict:
         ),
     )
 
-    fig2 = go.Figure(
+    fig2 = fs.Figure(
         data=[
-            go.Scatter(
+            fs.Scatter(
                 x=[0, 1],
                 y=[0, 0],
                 mode="lines+markers",
@@ -108,7 +107,7 @@ def build() -> dict:
                 line=dict(color="#66d9ef", width=3),
                 marker=dict(size=6),
             ),
-            go.Scatter(
+            fs.Scatter(
                 x=[0, 0.8],
                 y=[0, -0.3],
                 mode="lines+markers",
@@ -116,7 +115,7 @@ def build() -> dict:
                 line=dict(color="#a6e22e", width=3),
                 marker=dict(size=6),
             ),
-            go.Scatter(
+            fs.Scatter(
                 x=[0, 0.8],
                 y=[0, 0],
                 mode="lines",
@@ -124,7 +123,7 @@ def build() -> dict:
                 line=dict(color="rgba(255,255,255,0.6)", width=2, dash="dot"),
             ),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="相量图：V 与 I（功率因数 cosφ = 投影/长度）",
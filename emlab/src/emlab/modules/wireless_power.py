@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import plotly.graph_objects as go
-
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, slider
 
 
@@ -43,9 +42,9 @@ def build() -> dict:
         ]
     )
 
-    fig0 = go.Figure(
-        data=[go.Scatter(x=[0.6, 1.4], y=[0.1, 0.2], mode="lines", line=dict(color="#66d9ef", width=2), name="η(f)")],
-        layout=go.Layout(
+    fig0 = fs.Figure(
+        data=[fs.Scatter(x=[0.6, 1.4], y=[0.1, 0.2], mode="lines", line=dict(color="#66d9ef", width=2), name="η(f)")],
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="传输效率 η vs 归一化频率 f/f0",
@@ -56,12 +55,12 @@ def build() -> dict:
         ),
     )
 
-    fig1 = go.Figure(
+    fig1 = fs.Figure(
         data=[
-            go.Scatter(x=[0.6, 1.4], y=[1, 2], mode="lines", line=dict(color="#a6e22e", width=2), name="|I1|"),
-            go.Scatter(x=[0.6, 1.4], y=[0.5, 1.0], mode="lines", line=dict(color="#ff6b6b", width=2), name="|I2|"),
+            fs.Scatter(x=[0.6, 1.4], y=[1, 2], mode="lines", line=dict(color="#a6e22e", width=2), name="|I1|"),
+            fs.Scatter(x=[0.6, 1.4], y=[0.5, 1.0], mode="lines", line=dict(color="#ff6b6b", width=2), name="|I2|"),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="电流幅值（频域）|I1| 与 |I2|",
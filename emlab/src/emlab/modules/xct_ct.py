@@ -1,88 +1,181 @@
 from __future__ import annotations
 
 import math
-from typing import Literal
+from functools import lru_cache
+from typing import NamedTuple
 
 import numpy as np
-import plotly.graph_objects as go
+from scipy import sparse
 
+from emlab.common import figspec as fs
 from emlab.common.htmlbits import buttons, select, slider
 
 
-def _make_phantom(n: int = 64) -> np.ndarray:
-    y, x = np.mgrid[-1:1 : complex(n), -1:1 : complex(n)]
-    img = np.zeros((n, n), dtype=float)
+class _Ellipse(NamedTuple):
+    """One ellipse of a phantom. The image spans [-1, 1] in x (columns) and y (rows, downwards)."""
 
-    def add_ellipse(x0, y0, a, b, angle_deg, value):
-        ang = math.radians(angle_deg)
-        xr = (x - x0) * math.cos(ang) + (y - y0) * math.sin(ang)
-        yr = -(x - x0) * math.sin(ang) + (y - y0) * math.cos(ang)
-        mask = (xr / a) ** 2 + (yr / b) ** 2 <= 1.0
-        img[mask] += value
-
-    add_ellipse(0.0, 0.0, 0.85, 0.65, 0, 0.9)
-    add_ellipse(-0.25, 0.10, 0.25, 0.12, 20, 0.25)
-    add_ellipse(0.25, 0.18, 0.20, 0.10, -35, 0.22)
-    add_ellipse(0.18, -0.25, 0.18, 0.14, 10, 0.18)
-    add_ellipse(-0.15, -0.28, 0.18, 0.10, -10, 0.15)
-    img = np.clip(img, 0.0, 1.0)
-    return img
+    x0: float
+    y0: float
+    a: float  # semi-axis along the ellipse's own x axis, rotated by angle_deg
+    b: float
+    angle_deg: float
+    value: float  # attenuation added inside
 
 
-def _radon_fallback(img: np.ndarray, angles_deg: np.ndarray) -> np.ndarray:
-    from scipy.ndimage import rotate
+# body plus four inserts; each insert adds 0.1, so it reads 1.0 (1.1 where two overlap)
+_PHANTOM = (
+    _Ellipse(0.0, 0.0, 0.85, 0.65, 0, 0.9),
+    _Ellipse(-0.25, 0.10, 0.25, 0.12, 20, 0.1),
+    _Ellipse(0.25, 0.18, 0.20, 0.10, -35, 0.1),
+    _Ellipse(0.18, -0.25, 0.18, 0.14, 10, 0.1),
+    _Ellipse(-0.15, -0.28, 0.18, 0.10, -10, 0.1),
+)
 
-    n = img.shape[0]
-    sino = np.zeros((n, len(angles_deg)), dtype=float)
-    for i, ang in enumerate(angles_deg):
-        rot = rotate(img, float(ang), reshape=False, order=1, mode="constant", cval=0.0)
-        sino[:, i] = rot.sum(axis=0)
-    return sino
 
-
-def _ramp_filter(proj: np.ndarray) -> np.ndarray:
-    # proj: (n_det, n_angles)
-    n = proj.shape[0]
-    freqs = np.fft.rfftfreq(n).reshape(-1, 1)
-    filt = np.abs(freqs)
-    P = np.fft.rfft(proj, axis=0)
-    return np.fft.irfft(P * filt, n=n, axis=0)
+def _make_phantom(n: int = 64, ellipses: tuple[_Ellipse, ...] = _PHANTOM) -> np.ndarray:
+    """The phantom sampled at n×n pixel centres (the corners of the image sit at ±1)."""
+    y, x = np.mgrid[-1:1 : complex(n), -1:1 : complex(n)]
+    img = np.zeros((n, n), dtype=float)
+    for e in ellipses:
+        ang = math.radians(e.angle_deg)
+        xr = (x - e.x0) * math.cos(ang) + (y - e.y0) * math.sin(ang)
+        yr = -(x - e.x0) * math.sin(ang) + (y - e.y0) * math.cos(ang)
+        img[(xr / e.a) ** 2 + (yr / e.b) ** 2 <= 1.0] += e.value
+    return img
 
 
-def _iradon_fallback(
-    sino: np.ndarray, angles_deg: np.ndarray, method: Literal["bp", "fbp"]
+def _ellipse_sinogram(
+    angles_deg: np.ndarray, n: int, n_det: int | None = None, ellipses: tuple[_Ellipse, ...] = _PHANTOM
 ) -> np.ndarray:
-    from scipy.ndimage import rotate
-
-    n = sino.shape[0]
-    proj = sino if method == "bp" else _ramp_filter(sino)
-    recon = np.zeros((n, n), dtype=float)
-    for i, ang in enumerate(angles_deg):
-        back = np.tile(proj[:, i], (n, 1))
-        recon += rotate(back, -float(ang), reshape=False, order=1, mode="constant", cval=0.0)
-    recon *= math.pi / (2.0 * len(angles_deg))
-    recon = np.clip(recon, 0.0, None)
-    return recon
+    """
+    Exact sinogram (det, angle) of the ellipse phantom as sampled by `_make_phantom(n)`, in the
+    detector geometry of `_system_matrix` (default `_detector_bins(n)` bins), in pixel units.
+
+    A line at distance t from an ellipse's centre, across a chord direction where the
+    ellipse's half-width is w, crosses it over 2ab·sqrt(w² - t²)/w². All ellipses, bins and
+    angles are evaluated in one broadcast, so the cost does not depend on n beyond n_det.
+    """
+    n_det = _detector_bins(n) if n_det is None else n_det
+    h = (n - 1) / 2.0  # pixels per image unit
+    theta = np.deg2rad(np.asarray(angles_deg, dtype=float))
+    cos, sin = np.cos(theta), np.sin(theta)
+    # bin centres as signed distances along (cosθ, -sinθ), in image units
+    t = ((np.arange(n_det) - n_det // 2)[:, None] - (h - n // 2) * (cos - sin)) / h
+    x0, y0, a, b, phi, value = (np.array(col, dtype=float)[:, None, None] for col in zip(*ellipses))
+    phi = np.deg2rad(phi)
+    w2 = (a * np.cos(theta + phi)) ** 2 + (b * np.sin(theta + phi)) ** 2
+    chord2 = w2 - (t - (x0 * cos - y0 * sin)) ** 2
+    return h * np.sum(2.0 * value * a * b * np.sqrt(np.maximum(chord2, 0.0)) / w2, axis=0)
+
+
+def _detector_bins(n: int) -> int:
+    """Detector width skimage's `radon(..., circle=False)` uses: the image diagonal, rounded up."""
+    return n + int(math.ceil(math.sqrt(2.0) * n - n))
+
+
+@lru_cache(maxsize=8)
+def _system_matrix(n: int, angles_deg: tuple[float, ...], n_det: int) -> sparse.csc_matrix:
+    """
+    Radon system matrix A for an n×n image: `A @ img.ravel()` is the sinogram, angle-major
+    (row `i*n_det + s` = detector bin s at angle i), and `A.T` is the back-projection.
+
+    Same geometry as skimage's `radon`/`iradon` (circle=False): pixel (r, c) projects to
+    s = x·cosθ - y·sinθ + n_det//2 with x = c - n//2, y = r - n//2. Each pixel is a unit
+    square: its shadow on the detector is a trapezoid of width |cosθ|+|sinθ| around s, which
+    overlaps at most three bins; the overlaps are the matrix entries. Three entries per pixel
+    and angle lets the matrix be assembled column by column (CSC) without sorting. float32
+    weights + int32 rows, 8 bytes per entry: 1.5 MB per angle at n=256.
+    """
+    x = np.tile(np.arange(n) - n // 2, n).astype(float)
+    y = np.repeat(np.arange(n) - n // 2, n).astype(float)
+    data = np.empty((len(angles_deg), n * n, 3), dtype=np.float32)
+    rows = np.empty((len(angles_deg), n * n, 3), dtype=np.int32)
+
+    def ramp2(t: np.ndarray) -> np.ndarray:
+        return np.square(np.maximum(t, 0.0))
+
+    # a chunk of angles at a time: vectorized, but small enough to stay in cache
+    step = max(1, (1 << 16) // (n * n))
+    bin_offsets = np.arange(3, dtype=np.int32)
+    for start in range(0, len(angles_deg), step):
+        theta = np.deg2rad(np.asarray(angles_deg[start : start + step]))[:, None]
+        cos, sin = np.cos(theta), np.sin(theta)
+        # the trapezoid is a box of width a convolved with one of width b
+        a, b = np.maximum(np.abs(cos), 1e-6), np.maximum(np.abs(sin), 1e-6)
+        half, d = (a + b) / 2.0, (a - b) / 2.0
+
+        def cdf(t: np.ndarray) -> np.ndarray:  # share of the shadow below s + t
+            return (ramp2(t + half) - ramp2(t + d) - ramp2(t - d) + ramp2(t - half)) / (2.0 * a * b)
+
+        s = x * cos - y * sin + n_det // 2  # (angles, pixels)
+        first = np.floor(s - half + 0.5)  # lowest bin the shadow reaches (bin j covers j±0.5)
+        edge = first + 0.5 - s  # upper edge of that bin, relative to s; the next edge is edge + 1
+        below1, below2 = cdf(edge), cdf(edge + 1.0)
+        bins = first.astype(np.int32)[..., None] + bin_offsets
+        inside = (bins >= 0) & (bins < n_det)
+        chunk = slice(start, start + len(theta))
+        data[chunk] = np.where(inside, np.stack([below1, below2 - below1, 1.0 - below2], axis=-1), 0.0)
+        angle_rows = (np.arange(chunk.start, chunk.stop, dtype=np.int32) * n_det)[:, None, None]
+        rows[chunk] = np.where(inside, bins + angle_rows, 0)
+
+    per_pixel = 3 * len(angles_deg)
+    return sparse.csc_matrix(
+        (data.transpose(1, 0, 2).ravel(), rows.transpose(1, 0, 2).ravel(), np.arange(0, n * n * per_pixel + 1, per_pixel)),
+        shape=(len(angles_deg) * n_det, n * n),
+    )
 
 
-def _radon(img: np.ndarray, angles_deg: np.ndarray) -> np.ndarray:
-    try:
-        from skimage.transform import radon
+def _ramp_filter(proj: np.ndarray, axis: int = 0) -> np.ndarray:
+    """skimage's "ramp" filter along the detector `axis`, zero-padded to a power of two; one rfft."""
+    n_det = proj.shape[axis]
+    size = max(64, 1 << math.ceil(math.log2(2 * n_det)))
+    k = np.concatenate([np.arange(1, size // 2 + 1, 2), np.arange(size // 2 - 1, 0, -2)])
+    f = np.zeros(size)
+    f[0] = 0.25
+    f[1::2] = -1.0 / (np.pi * k) ** 2
+    filt = 2.0 * np.fft.rfft(f).real  # f is symmetric, so its spectrum is real
+    shape = [1] * proj.ndim
+    shape[axis] = -1
+    P = np.fft.rfft(proj, n=size, axis=axis)
+    filtered = np.fft.irfft(P * filt.reshape(shape), n=size, axis=axis)
+    return np.take(filtered, np.arange(n_det), axis=axis)
 
-        return radon(img, theta=angles_deg, circle=False).astype(float)
-    except Exception:
-        return _radon_fallback(img, angles_deg)
 
+# pixels × angles per system matrix (24 MB): larger images are back-projected a few angles at a time
+_MATRIX_PIXEL_ANGLES = 1 << 20
+
+
+def _reconstruct(sinos: np.ndarray, angles_deg: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Back-projection (BP) and filtered back-projection (FBP) of a stack of sinograms
+    (k, det, angle) -> two (k, n, n) stacks: one ramp filtering over the whole stack and one
+    sparse product `A.T @ [sinograms | filtered]` for all 2k images (per chunk of angles, so the
+    cached matrices stay small for large images).
+    """
+    stack = np.concatenate([sinos, _ramp_filter(sinos, axis=1)])
+    step = max(1, _MATRIX_PIXEL_ANGLES // (n * n))
+    recon = np.zeros((len(stack), n * n), dtype=np.float32)
+    for start in range(0, len(angles_deg), step):
+        part = stack[:, :, start : start + step]
+        A = _system_matrix(n, tuple(map(float, angles_deg[start : start + step])), sinos.shape[1])
+        columns = part.transpose(2, 1, 0).reshape(-1, len(stack))  # row i*n_det + s, one column per image
+        recon += (A.T @ columns.astype(A.dtype)).T
+    recon = recon.reshape(len(stack), n, n)
+    recon *= math.pi / (2.0 * len(angles_deg))
+    return recon[: len(sinos)], recon[len(sinos) :]
 
-def _iradon(img: np.ndarray, angles_deg: np.ndarray, method: Literal["bp", "fbp"]) -> np.ndarray:
-    try:
-        from skimage.transform import iradon
 
-        if method == "bp":
-            return iradon(img, theta=angles_deg, filter_name=None, circle=False).astype(float)
-        return iradon(img, theta=angles_deg, filter_name="ramp", circle=False).astype(float)
-    except Exception:
-        return _iradon_fallback(img, angles_deg, method=method)
+def _level(n: int, n_angles: int) -> dict:
+    """
+    Phantom and its clean sinogram (det, angle) over `n_angles` angles in [0°, 180°) at n×n;
+    the page subsamples, adds noise and reconstructs from it (float32 is plenty for display).
+    """
+    angles = np.linspace(0, 180, n_angles, endpoint=False)
+    return {
+        "size": n,
+        "phantom": _make_phantom(n).astype(np.float32),
+        "sinogram": _ellipse_sinogram(angles, n).astype(np.float32),
+    }
 
 
 def build() -> dict:
@@ -99,59 +192,50 @@ def build() -> dict:
     </p>
     <p>
       本页面用简化模型演示：phantom → Radon 投影 → sinogram → 反投影/滤波反投影(FBP) 重建。
-      为保证离线交互性能，重建结果在 Python 端对离散参数做了预计算。
+      sinogram 在 Python 端由 phantom 解析算出；挑选角度、加噪声与重建都在浏览器里（后台 Web Worker）实时完成，N_angles 与 σ 可以连续调节。
       你可以把它理解为：<b>sinogram 就是 Radon 变换的输出</b>；<b>BP</b> 是把每个角度的投影“沿着该角度铺回去”（反投影/伴随算子）；
       <b>FBP</b> 则是在反投影前对投影做滤波来补偿模糊，从而边缘更清晰。
     </p>
     """
 
-    n = 64
-    phantom = _make_phantom(n)
-
-    angles_opts = [30, 60, 90, 180]
-    sigma_opts = [0.0, 0.02, 0.05, 0.10]
-    rng = np.random.default_rng(123)
-
-    sinograms: list[list[list[list[float]]]] = []  # [a][s] -> 2d list
-    recon_bp: list[list[list[list[float]]]] = []
-    recon_fbp: list[list[list[list[float]]]] = []
-
-    for na in angles_opts:
-        angles = np.linspace(0, 180, na, endpoint=False)
-        sino_clean = _radon(phantom, angles)
-        maxv = float(np.max(sino_clean)) if np.max(sino_clean) > 0 else 1.0
+    # one clean sinogram per level over n_angles angles; any N_angles <= n_angles picks its columns
+    n_angles = 180
+    n_default, sigma_default = 90, 0.02
 
-        sino_for_na: list[list[list[float]]] = []
-        bp_for_na: list[list[list[float]]] = []
-        fbp_for_na: list[list[list[float]]] = []
-        for sig in sigma_opts:
-            noise = rng.normal(0.0, sig * maxv, size=sino_clean.shape)
-            sino = sino_clean + noise
-            bp = _iradon(sino, angles, method="bp")
-            fbp = _iradon(sino, angles, method="fbp")
+    # resolution pyramid: the page starts on the first level (shipped in data_payload); the finer
+    # ones are data_blocks, decoded only when the module asks for them (emlabGetData)
+    sizes = [64, 128, 256]
+    levels = [_level(size, n_angles) for size in sizes]
+    base = levels[0]
+    n = base["size"]
+    phantom = base["phantom"]
 
-            sino_for_na.append(sino.astype(float).tolist())
-            bp_for_na.append(bp.astype(float).tolist())
-            fbp_for_na.append(fbp.astype(float).tolist())
-
-        sinograms.append(sino_for_na)
-        recon_bp.append(bp_for_na)
-        recon_fbp.append(fbp_for_na)
+    # placeholders until the page's first reconstruction: the noise-free default view
+    picks = np.round(np.arange(n_default) * n_angles / n_default).astype(int)
+    sino0 = base["sinogram"][:, picks]
+    bp0, fbp0 = _reconstruct(sino0[None].astype(float), picks * (180.0 / n_angles), n)
+    bp0, fbp0 = bp0[0], fbp0[0]
 
     controls_html = "\n".join(
         [
-            select(
+            slider(
                 cid=f"{module_id}-N",
                 label="投影角度数 N_angles",
-                value="90",
-                options=[(str(v), str(v)) for v in angles_opts],
+                vmin=4,
+                vmax=n_angles,
+                step=1,
+                value=n_default,
+                unit="",
                 help_text="角度越多，重建越好，但采集/计算成本也更高。",
             ),
-            select(
+            slider(
                 cid=f"{module_id}-sigma",
                 label="噪声水平 σ（相对）",
-                value="0.02",
-                options=[(f"{v:.2f}", f"{v:.2f}") for v in sigma_opts],
+                vmin=0,
+                vmax=0.2,
+                step=0.005,
+                value=sigma_default,
+                unit="",
                 help_text="σ 越大，sinogram 越“花”，重建噪声与伪影更明显。",
             ),
             slider(
@@ -189,75 +273,76 @@ def build() -> dict:
         ]
     )
 
-    # figures
-    fig0 = go.Figure(
-        data=[go.Heatmap(z=phantom.tolist(), colorscale="Gray", showscale=False)],
-        layout=go.Layout(
+    # figures (the reconstructions show the placeholders above). The images are PNG image traces
+    # at every level (fs.heatmap image=True), so the 128/256 levels the page swaps in are never
+    # drawn as heatmap cells; autorange=True keeps row 0 at the bottom.
+    fig0 = fs.Figure(
+        data=fs.heatmap(phantom, image=True, colorscale="Gray", showscale=False),
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=30, r=10, t=40, b=30),
             title="原图 phantom（截面衰减系数 μ 的简化示意）",
             xaxis=dict(showgrid=False, zeroline=False, visible=False),
-            yaxis=dict(showgrid=False, zeroline=False, visible=False, scaleanchor="x"),
+            yaxis=dict(showgrid=False, zeroline=False, visible=False, scaleanchor="x", autorange=True),
         ),
     )
 
-    fig1 = go.Figure(
-        data=[go.Heatmap(z=sinograms[2][1], colorscale="Viridis", colorbar=dict(title="∫μds"))],
-        layout=go.Layout(
+    fig1 = fs.Figure(
+        data=fs.heatmap(sino0, image=True, colorscale="Viridis", colorbar=dict(title="∫μds")),
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=50, r=10, t=40, b=45),
             title="Sinogram（投影数据）",
             xaxis_title="角度索引",
-            yaxis_title="探测器索引",
+            # not square pixels: the angle axis has anywhere from 4 to 180 columns
+            yaxis=dict(title="探测器索引", autorange=True, scaleanchor=False),
         ),
     )
 
-    fig2 = go.Figure(
-        data=[go.Heatmap(z=recon_bp[2][1], colorscale="Gray", showscale=False)],
-        layout=go.Layout(
+    fig2 = fs.Figure(
+        data=fs.heatmap(bp0, image=True, colorscale="Gray", showscale=False),
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=30, r=10, t=40, b=30),
             title="重建：简单反投影 BP",
             xaxis=dict(showgrid=False, zeroline=False, visible=False),
-            yaxis=dict(showgrid=False, zeroline=False, visible=False, scaleanchor="x"),
+            yaxis=dict(showgrid=False, zeroline=False, visible=False, scaleanchor="x", autorange=True),
         ),
     )
 
-    fig3 = go.Figure(
-        data=[go.Heatmap(z=recon_fbp[2][1], colorscale="Gray", showscale=False)],
-        layout=go.Layout(
+    fig3 = fs.Figure(
+        data=fs.heatmap(fbp0, image=True, colorscale="Gray", showscale=False),
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=30, r=10, t=40, b=30),
             title="重建：滤波反投影 FBP",
             xaxis=dict(showgrid=False, zeroline=False, visible=False),
-            yaxis=dict(showgrid=False, zeroline=False, visible=False, scaleanchor="x"),
+            yaxis=dict(showgrid=False, zeroline=False, visible=False, scaleanchor="x", autorange=True),
         ),
     )
 
     # difference (placeholder)
-    diff0 = (np.array(recon_fbp[2][1]) - np.array(recon_bp[2][1])).tolist()
-    fig4 = go.Figure(
-        data=[go.Heatmap(z=diff0, colorscale="RdBu", zmid=0, colorbar=dict(title="Δ"))],
-        layout=go.Layout(
+    diff0 = fbp0 - bp0
+    fig4 = fs.Figure(
+        data=fs.heatmap(diff0, image=True, colorscale="RdBu", zmid=0, colorscales=("Viridis",), colorbar=dict(title="Δ")),
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=40, r=10, t=40, b=30),
             title="差分：FBP - BP（突出边缘/伪影差异）",
             xaxis=dict(showgrid=False, zeroline=False, visible=False),
-            yaxis=dict(showgrid=False, zeroline=False, visible=False, scaleanchor="x"),
+            yaxis=dict(showgrid=False, zeroline=False, visible=False, scaleanchor="x", autorange=True),
         ),
     )
 
     x_idx = np.arange(n)
-    prof0 = phantom[n // 2, :].astype(float)
-    prof_bp0 = np.array(recon_bp[2][1])[n // 2, :].astype(float)
-    prof_fbp0 = np.array(recon_fbp[2][1])[n // 2, :].astype(float)
-    fig5 = go.Figure(
+    py = n // 2
+    fig5 = fs.Figure(
         data=[
-            go.Scatter(x=x_idx.tolist(), y=prof0.tolist(), mode="lines", name="phantom", line=dict(color="#ffffff", width=2)),
-            go.Scatter(x=x_idx.tolist(), y=prof_bp0.tolist(), mode="lines", name="BP", line=dict(color="#66d9ef", width=2)),
-            go.Scatter(x=x_idx.tolist(), y=prof_fbp0.tolist(), mode="lines", name="FBP", line=dict(color="#a6e22e", width=2)),
+            fs.Scatter(x=x_idx, y=fs.ref("phantom", py), mode="lines", name="phantom", line=dict(color="#ffffff", width=2)),
+            fs.Scatter(x=x_idx, y=bp0[py], mode="lines", name="BP", line=dict(color="#66d9ef", width=2)),
+            fs.Scatter(x=x_idx, y=fbp0[py], mode="lines", name="FBP", line=dict(color="#a6e22e", width=2)),
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="剖线对比（同一行 y 的强度分布）",
@@ -267,18 +352,18 @@ def build() -> dict:
         ),
     )
 
-    proj0 = np.array(sinograms[2][1], dtype=float)[:, 0]
-    fig6 = go.Figure(
+    proj0 = sino0[:, 0]
+    fig6 = fs.Figure(
         data=[
-            go.Scatter(
-                x=x_idx.tolist(),
-                y=proj0.tolist(),
+            fs.Scatter(
+                x=np.arange(len(proj0)),
+                y=proj0,
                 mode="lines",
                 name="p(s)（当前投影）",
                 line=dict(color="#ffd166", width=2),
             )
         ],
-        layout=go.Layout(
+        layout=fs.Layout(
             template="plotly_dark",
             margin=dict(l=55, r=20, t=40, b=45),
             title="当前角度的一条投影 p(s)（对应 sinogram 的一列）",
@@ -309,16 +394,12 @@ def build() -> dict:
     """
 
     data_payload = {
-        "size": n,
-        "angles_opts": angles_opts,
-        "sigma_opts": sigma_opts,
+        **base,
+        "sizes": sizes,
         "kVp_ref": 80,
-        "phantom": phantom.astype(float).tolist(),
-        "sinograms": sinograms,  # [a][s] -> 2d
-        "recon_bp": recon_bp,
-        "recon_fbp": recon_fbp,
-        "defaults": {"N": "90", "sigma": "0.02", "kVp": 80, "py": n // 2, "diff": "signed"},
+        "defaults": {"N": n_default, "sigma": sigma_default, "kVp": 80, "py": n // 2, "diff": "signed"},
     }
+    data_blocks = {str(level["size"]): level for level in levels[1:]}
 
     js = rf"""
     function init_{module_id}(){{
@@ -335,6 +416,8 @@ def build() -> dict:
         reset: root.querySelector("#{module_id}-reset"),
       }};
 
+      emlabBindValue(root, "{module_id}-N", "", 0);
+      emlabBindValue(root, "{module_id}-sigma", "", 3);
       emlabBindValue(root, "{module_id}-kVp", " kVp", 0);
       emlabBindValue(root, "{module_id}-py", "", 0);
 
@@ -356,8 +439,209 @@ def build() -> dict:
         {{key:"剖线 y", id:"{module_id}-ro-y", value:"—"}},
         {{key:"动画：角度索引 k", id:"{module_id}-ro-ki", value:"—"}},
         {{key:"动画：角度 θ", id:"{module_id}-ro-th", value:"—"}},
+        {{key:"分辨率", id:"{module_id}-ro-n", value:"—"}},
+        {{key:"重建耗时", id:"{module_id}-ro-ms", value:"—"}},
       ]);
 
+      // resolution pyramid: `cur` starts as the coarse level in data; finer levels are data blocks
+      // ("128", "256") decoded on request and swapped in by useLevel
+      let cur = data;
+
+      function fbpCore(){{
+        // Noise + FBP on typed arrays, no DOM: runs in the Web Worker (built from this function's
+        // source) or, without workers, on the main thread. Same geometry and ramp filter as the
+        // Python side: pixel (r, c) projects to s = x·cosθ - y·sinθ + nDet/2, x = c - n/2, y = r - n/2.
+        let lvl = null;
+        function fftTables(size){{
+          const rev = new Uint32Array(size), cos = new Float64Array(size/2), sin = new Float64Array(size/2);
+          const bits = Math.round(Math.log2(size));
+          for(let i=0;i<size;i++){{
+            let r = 0;
+            for(let b=0;b<bits;b++) r |= ((i >> b) & 1) << (bits-1-b);
+            rev[i] = r;
+          }}
+          for(let i=0;i<size/2;i++){{ cos[i] = Math.cos(2*Math.PI*i/size); sin[i] = -Math.sin(2*Math.PI*i/size); }}
+          return {{size, rev, cos, sin}};
+        }}
+        function fft(t, re, im, inverse){{
+          // in-place radix-2; the inverse is unscaled
+          const n = t.size, sgn = inverse ? -1 : 1;
+          for(let i=0;i<n;i++){{
+            const j = t.rev[i];
+            if(j > i){{
+              let x = re[i]; re[i] = re[j]; re[j] = x;
+              x = im[i]; im[i] = im[j]; im[j] = x;
+            }}
+          }}
+          for(let len=2; len<=n; len<<=1){{
+            const half = len >> 1, step = n / len;
+            for(let i=0;i<n;i+=len){{
+              for(let k=0;k<half;k++){{
+                const wr = t.cos[k*step], wi = sgn*t.sin[k*step];
+                const a = i+k, b = a+half;
+                const xr = re[b]*wr - im[b]*wi, xi = re[b]*wi + im[b]*wr;
+                re[b] = re[a] - xr; im[b] = im[a] - xi;
+                re[a] += xr; im[a] += xi;
+              }}
+            }}
+          }}
+        }}
+        function setLevel(m){{
+          // m: {{n, nDet, nAng, sino: Float32Array (det, angle) row-major}}
+          let size = 64;
+          while(size < 2*m.nDet) size <<= 1;
+          const t = fftTables(size);
+          // spectrum of the spatial ramp kernel (Kak & Slaney), as skimage's "ramp" filter
+          const re = new Float64Array(size), im = new Float64Array(size);
+          re[0] = 0.25;
+          for(let i=1;i<size;i+=2){{ const k = i < size/2 ? i : size-i; re[i] = -1/Math.pow(Math.PI*k, 2); }}
+          fft(t, re, im, false);
+          const filt = new Float64Array(size);
+          for(let i=0;i<size;i++) filt[i] = 2*re[i]/size;  // the 1/size of the inverse folded in
+          let maxv = 0;
+          for(let i=0;i<m.sino.length;i++) if(m.sino[i] > maxv) maxv = m.sino[i];
+          lvl = Object.assign({{}}, m, {{t, filt, maxv: maxv > 0 ? maxv : 1, noise: {{}}}});
+        }}
+        function gaussian(count, seed){{
+          // fixed-seed normal draws (mulberry32 + Box-Muller): σ only scales the same noise
+          let a = seed >>> 0;
+          const u = () => {{
+            a = (a + 0x6D2B79F5) >>> 0;
+            let x = Math.imul(a ^ (a >>> 15), 1 | a);
+            x = (x + Math.imul(x ^ (x >>> 7), 61 | x)) ^ x;
+            return ((x ^ (x >>> 14)) >>> 0) / 4294967296;
+          }};
+          const out = new Float32Array(count);
+          for(let i=0;i<count;i+=2){{
+            const r = Math.sqrt(-2*Math.log(1 - u())), p = 2*Math.PI*u();
+            out[i] = r*Math.cos(p);
+            if(i+1 < count) out[i+1] = r*Math.sin(p);
+          }}
+          return out;
+        }}
+        function backproject(proj, filtered, theta, N, n, nDet, bp, fbp){{
+          // proj/filtered: (angle, det) -> bp/fbp, in one pass (same detector position per pixel);
+          // linear interpolation between detector bins, zero outside them (as skimage's iradon)
+          const c0 = n >> 1, d0 = nDet >> 1;
+          for(let k=0;k<N;k++){{
+            const th = theta[k]*Math.PI/180, cs = Math.cos(th), sn = Math.sin(th);
+            const p = proj.subarray(k*nDet, (k+1)*nDet), q = filtered.subarray(k*nDet, (k+1)*nDet);
+            for(let r=0;r<n;r++){{
+              let s = -c0*cs - (r-c0)*sn + d0;
+              for(let c=0, o=r*n; c<n; c++, o++, s+=cs){{
+                if(s >= 0 && s < nDet-1){{
+                  const i0 = s | 0, w = s - i0;
+                  bp[o] += p[i0] + w*(p[i0+1] - p[i0]);
+                  fbp[o] += q[i0] + w*(q[i0+1] - q[i0]);
+                }}
+              }}
+            }}
+          }}
+        }}
+        function run(N, sigma){{
+          const t0 = performance.now();
+          const {{n, nDet, nAng, sino, t, filt, maxv}} = lvl;
+          N = Math.max(1, Math.min(nAng, N|0));
+          // N evenly spread columns of the clean sinogram, at their own angles
+          const theta = new Float64Array(N), proj = new Float32Array(N*nDet);
+          const noise = lvl.noise[N] || (lvl.noise[N] = gaussian(N*nDet, 123 + N));
+          const amp = sigma*maxv;
+          for(let k=0;k<N;k++){{
+            const j = Math.round(k*nAng/N);
+            theta[k] = 180*j/nAng;
+            for(let i=0;i<nDet;i++) proj[k*nDet+i] = sino[i*nAng+j] + amp*noise[k*nDet+i];
+          }}
+          // ramp filter, two real projections per complex FFT (the filter is real and even)
+          const size = t.size, filtered = new Float32Array(N*nDet);
+          const re = new Float64Array(size), im = new Float64Array(size);
+          for(let k=0;k<N;k+=2){{
+            re.fill(0); im.fill(0);
+            for(let i=0;i<nDet;i++){{ re[i] = proj[k*nDet+i]; if(k+1 < N) im[i] = proj[(k+1)*nDet+i]; }}
+            fft(t, re, im, false);
+            for(let i=0;i<size;i++){{ re[i] *= filt[i]; im[i] *= filt[i]; }}
+            fft(t, re, im, true);
+            for(let i=0;i<nDet;i++){{ filtered[k*nDet+i] = re[i]; if(k+1 < N) filtered[(k+1)*nDet+i] = im[i]; }}
+          }}
+          const bp = new Float32Array(n*n), fbp = new Float32Array(n*n);
+          backproject(proj, filtered, theta, N, n, nDet, bp, fbp);
+          const w = Math.PI/(2*N);
+          for(let i=0;i<n*n;i++){{ bp[i] *= w; fbp[i] *= w; }}
+          // sinogram back to (det, angle) for display
+          const sinoOut = new Float32Array(nDet*N);
+          for(let k=0;k<N;k++) for(let i=0;i<nDet;i++) sinoOut[i*N+k] = proj[k*nDet+i];
+          return {{n, nDet, N, sigma, theta, sino: sinoOut, bp, fbp, ms: performance.now() - t0}};
+        }}
+        return {{setLevel, run}};
+      }}
+
+      // reconstruction jobs: one in flight, the newest waiting one replaces older ones
+      let core = null, worker = null, sentLevel = null, busy = false, queued = null, lastJob = null, recon = null;
+      function levelMsg(d){{
+        const rows = d.sinogram, nDet = rows.length, nAng = rows[0].length;
+        const sino = new Float32Array(nDet*nAng);
+        for(let i=0;i<nDet;i++) sino.set(rows[i], i*nAng);
+        return {{n: d.size, nDet, nAng, sino}};
+      }}
+      function startWorker(){{
+        // Blob URL instead of a worker file, so the single-file page works offline (file://)
+        if(typeof Worker !== "function" || typeof Blob !== "function" || !window.URL) return;
+        try{{
+          const src = "const core = (" + fbpCore.toString() + ")();\n" +
+            "onmessage = e => {{ const m = e.data; if(m.level){{ core.setLevel(m.level); return; }}" +
+            " const r = core.run(m.N, m.sigma); r.key = m.key;" +
+            " postMessage(r, [r.theta.buffer, r.sino.buffer, r.bp.buffer, r.fbp.buffer]); }};";
+          const url = URL.createObjectURL(new Blob([src], {{type: "text/javascript"}}));
+          worker = new Worker(url);
+          worker.onmessage = e => {{ URL.revokeObjectURL(url); done(e.data); }};
+          worker.onerror = e => {{
+            // e.g. workers blocked for this origin: fall back to the main thread
+            if(e && e.preventDefault) e.preventDefault();
+            worker.terminate();
+            worker = null;
+            sentLevel = null;
+            const job = queued || lastJob;
+            busy = false;
+            queued = null;
+            if(job) send(job);
+          }};
+        }}catch(e){{ worker = null; }}
+      }}
+      function send(job){{
+        busy = true;
+        lastJob = job;
+        if(sentLevel !== cur){{
+          const msg = levelMsg(cur);
+          if(worker) worker.postMessage({{level: msg}});
+          else (core || (core = fbpCore())).setLevel(msg);
+          sentLevel = cur;
+        }}
+        if(worker){{ worker.postMessage(job); return; }}
+        const r = core.run(job.N, job.sigma);
+        r.key = job.key;
+        Promise.resolve().then(() => done(r));
+      }}
+      function request(job){{
+        if(busy){{
+          // the job in flight already is this one: drop whatever was waiting
+          queued = job.key === lastJob.key ? null : job;
+          return;
+        }}
+        if(recon && recon.key === job.key) return;
+        send(job);
+      }}
+      function done(r){{
+        busy = false;
+        const rows = (flat, nr, nc) => Array.from({{length: nr}}, (_, i) => flat.subarray(i*nc, (i+1)*nc));
+        recon = {{
+          key: r.key, N: r.N, sigma: r.sigma, theta: r.theta, ms: r.ms,
+          sino: rows(r.sino, r.nDet, r.N), bp: rows(r.bp, r.n, r.n), fbp: rows(r.fbp, r.n, r.n),
+        }};
+        const job = queued;
+        queued = null;
+        if(job) send(job);
+        render();
+      }}
+
       function scale2d(z, s){{
         const out = new Array(z.length);
         for(let i=0;i<z.length;i++){{
@@ -403,6 +687,7 @@ def build() -> dict:
       let scanIdx = 0;
       let scanN = 0;
       let cachedSino = null;
+      let cachedTheta = null;
       let cachedScale = 1.0;
       function stopPlay(){{ if(timer){{ clearInterval(timer); timer=null; }} }}
 
@@ -414,9 +699,9 @@ def build() -> dict:
         if(nAng <= 0) return;
         scanIdx = ((scanIdx % nAng) + nAng) % nAng;
 
-        const th = Math.PI * (scanIdx / nAng);
-        const thDeg = 180.0 * (scanIdx / nAng);
-        const npx = (data.size||64);
+        const thDeg = cachedTheta ? cachedTheta[scanIdx] : 180.0 * (scanIdx / nAng);
+        const th = Math.PI * thDeg / 180.0;
+        const npx = (cur.size||64);
         const cx = 0.5*(npx-1);
         const cy = 0.5*(npx-1);
         const L = 0.95*npx;
@@ -466,53 +751,61 @@ def build() -> dict:
       }}
 
       function update(){{
-        const N = parseInt(els.N.value, 10);
-        const sigma = parseFloat(els.sigma.value);
+        // N_angles/σ/level changes need a new reconstruction (drawn by done() when it arrives);
+        // meanwhile, and for the other controls, redraw the current one
+        const N = Math.round(emlabNum(els.N.value));
+        const sigma = emlabNum(els.sigma.value);
+        request({{key: (cur.size||64)+":"+N+":"+sigma, N, sigma}});
+        render();
+      }}
+
+      function render(){{
+        if(!recon) return;
         const kVp = emlabNum(els.kVp.value);
-        const py = Math.max(0, Math.min((data.size||64)-1, Math.round(emlabNum(els.py.value))));
+        const py = Math.max(0, Math.min((cur.size||64)-1, Math.round(emlabNum(els.py.value))));
         const diffMode = els.diff.value;
 
-        const aIdx = (data.angles_opts || []).indexOf(N);
-        const sIdx = (data.sigma_opts || []).indexOf(sigma);
         const ref = emlabNum(data.kVp_ref || 80);
         let scale = ref / Math.max(1e-6, kVp);
         scale = Math.max(0.4, Math.min(1.6, Math.pow(scale, 0.8)));
 
-        const phantom = data.phantom || [];
-        const sino = (data.sinograms && data.sinograms[aIdx] && data.sinograms[aIdx][sIdx]) ? data.sinograms[aIdx][sIdx] : [];
-        const bp = (data.recon_bp && data.recon_bp[aIdx] && data.recon_bp[aIdx][sIdx]) ? data.recon_bp[aIdx][sIdx] : [];
-        const fbp = (data.recon_fbp && data.recon_fbp[aIdx] && data.recon_fbp[aIdx][sIdx]) ? data.recon_fbp[aIdx][sIdx] : [];
+        const phantom = cur.phantom || [];
+        const sino = recon.sino, bp = recon.bp, fbp = recon.fbp;
+        if(bp.length !== phantom.length) return;  // a level swap is on its way
         const dimg = diff2d(bp, fbp, diffMode);
 
         cachedSino = sino;
+        cachedTheta = recon.theta;
         cachedScale = scale;
         if(cachedSino && cachedSino.length && (cachedSino[0]||[]).length){{
           scanN = (cachedSino[0]||[]).length;
           if(scanIdx >= scanN) scanIdx = 0;
         }}
 
-        Plotly.restyle(figP, {{z:[scale2d(phantom, scale)]}}, [0]);
-        Plotly.restyle(figS, {{z:[scale2d(sino, scale)]}}, [0]);
-        Plotly.restyle(figBP, {{z:[scale2d(bp, scale)]}}, [0]);
-        Plotly.restyle(figFBP, {{z:[scale2d(fbp, scale)]}}, [0]);
+        emlabSetHeatmap(figP, scale2d(phantom, scale));
+        emlabSetHeatmap(figS, scale2d(sino, scale));
+        emlabSetHeatmap(figBP, scale2d(bp, scale));
+        emlabSetHeatmap(figFBP, scale2d(fbp, scale));
         if(diffMode === "abs"){{
-          Plotly.restyle(figD, {{z:[scale2d(dimg, scale)], colorscale:["Viridis"], zmid:[null]}}, [0]);
+          emlabSetHeatmap(figD, scale2d(dimg, scale), {{colorscale:"Viridis", zmid:null}});
         }} else {{
-          Plotly.restyle(figD, {{z:[scale2d(dimg, scale)], colorscale:["RdBu"], zmid:[0]}}, [0]);
+          emlabSetHeatmap(figD, scale2d(dimg, scale), {{colorscale:"RdBu", zmid:0}});
         }}
 
         // profile line at row py
-        const npx = (data.size||64);
+        const npx = (cur.size||64);
         const x = Array.from({{length:npx}}, (_,i)=>i);
-        const pRow = phantom[py] || [];
-        const bpRow = bp[py] || [];
-        const fbpRow = fbp[py] || [];
+        const pRow = Array.from(phantom[py] || []);
+        const bpRow = Array.from(bp[py] || []);
+        const fbpRow = Array.from(fbp[py] || []);
         Plotly.restyle(figProf, {{x:[x,x,x], y:[pRow.map(v=>v*scale), bpRow.map(v=>v*scale), fbpRow.map(v=>v*scale)]}}, [0,1,2]);
 
-        root.querySelector("#{module_id}-ro-N").textContent = N.toString();
-        root.querySelector("#{module_id}-ro-s").textContent = sigma.toFixed(2);
+        root.querySelector("#{module_id}-ro-N").textContent = recon.N.toString();
+        root.querySelector("#{module_id}-ro-s").textContent = recon.sigma.toFixed(3);
         root.querySelector("#{module_id}-ro-k").textContent = "μ×"+emlabFmt(scale, 3)+"（教学近似）";
         root.querySelector("#{module_id}-ro-y").textContent = py.toString();
+        root.querySelector("#{module_id}-ro-n").textContent = npx+"×"+npx;
+        root.querySelector("#{module_id}-ro-ms").textContent = emlabFmt(recon.ms, 1)+" ms"+(worker ? "（Worker）" : "");
         if(phantom.length && bp.length) {{
           root.querySelector("#{module_id}-ro-bp").textContent = emlabFmt(nrmse(phantom, bp), 3);
           root.querySelector("#{module_id}-ro-fbp").textContent = emlabFmt(nrmse(phantom, fbp), 3);
@@ -529,6 +822,7 @@ def build() -> dict:
           const el = root.querySelector("#{module_id}-"+k);
           if(el) el.value = d[k];
         }});
+        els.py.value = (cur.size||64) >> 1;  // defaults.py is for the coarse level
         emlabRefreshBoundValues(root);
         update();
       }}
@@ -551,6 +845,54 @@ def build() -> dict:
           updateScan();
         }});
       }}
+
+      function rescaleZoom(gd, fx, fy){{
+        // keep a zoomed view on the same region when the image gets finer (pixel axes)
+        const lay = gd && gd.layout;
+        if(!lay || !lay.xaxis || !lay.yaxis) return;
+        const upd = {{}};
+        if(!lay.xaxis.autorange && lay.xaxis.range) upd["xaxis.range"] = lay.xaxis.range.map(v => (v+0.5)*fx-0.5);
+        if(!lay.yaxis.autorange && lay.yaxis.range) upd["yaxis.range"] = lay.yaxis.range.map(v => (v+0.5)*fy-0.5);
+        if(Object.keys(upd).length) Plotly.relayout(gd, upd);
+      }}
+
+      function useLevel(level){{
+        const size = level.size||64, old = cur.size||64;
+        if(size <= old) return;
+        const detOld = cur.sinogram.length, detNew = level.sinogram.length;
+        cur = Object.assign({{}}, data, level);
+        els.py.max = size - 1;
+        els.py.value = Math.round(emlabNum(els.py.value) * (size-1) / Math.max(1, old-1));
+        emlabRefreshBoundValues(root);
+        update();
+        [figP, figBP, figFBP, figD].forEach(gd => rescaleZoom(gd, size/old, size/old));
+        rescaleZoom(figS, 1, detNew/Math.max(1, detOld));
+        rescaleZoom(figProf, size/old, 1);
+        rescaleZoom(figProj, detNew/Math.max(1, detOld), 1);
+      }}
+
+      // progressive refinement: the next level as soon as the module is open, the finest one once
+      // an image is zoomed (decoding it costs more than the coarse view needs)
+      const sizes = (data.sizes || []).slice(1);
+      const pending = {{}};
+      function refine(size){{
+        if(pending[size] || size <= (cur.size||64)) return pending[size];
+        return pending[size] = emlabGetData(id, String(size)).then(useLevel);
+      }}
+      if(sizes.length){{
+        setTimeout(() => refine(sizes[0]), 0);
+        const finest = sizes[sizes.length-1];
+        [figP, figS, figBP, figFBP, figD].forEach(gd => {{
+          if(!gd || !gd.on || gd.dataset.emlabZoom) return;
+          gd.dataset.emlabZoom = "1";
+          gd.on("plotly_relayout", (ev) => {{
+            if(ev && (ev["xaxis.range[0]"] !== undefined || ev["xaxis.range"] || ev["yaxis.range[0]"] !== undefined)){{
+              (pending[sizes[0]] || Promise.resolve()).then(() => refine(finest));
+            }}
+          }});
+        }});
+      }}
+      startWorker();
       update();
     }}
     """
@@ -562,6 +904,7 @@ def build() -> dict:
         "controls_html": controls_html,
         "figures": [fig0, fig1, fig2, fig3, fig4, fig5, fig6],
         "data_payload": data_payload,
+        "data_blocks": data_blocks,
         "js": js,
         "pitfalls_html": pitfalls_html,
         "questions_html": questions_html,
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import urllib.request
+from dataclasses import dataclass
+from importlib import resources
+from importlib.resources.abc import Traversable
+from pathlib import Path
+from typing import Iterable, Iterator
+
+VENDOR_DIR = Path(__file__).resolve().parents[3] / "vendor" / "plotly"
+CDN_BASE = "https://cdn.plot.ly"
+_FETCH_TIMEOUT_S = 30
+
+# Official plotly.js partial dist bundles (dist/README.md), smallest first. Every bundle ships the
+# full core (layout components, modebar, Plotly.* API); they differ only in trace modules.
+PARTIAL_BUNDLES: dict[str, frozenset[str]] = {
+    "basic": frozenset({"bar", "pie", "scatter"}),
+    "cartesian": frozenset(
+        {
+            "bar",
+            "box",
+            "contour",
+            "heatmap",
+            "histogram",
+            "histogram2d",
+            "histogram2dcontour",
+            "image",
+            "pie",
+            "scatter",
+            "scatterternary",
+            "violin",
+        }
+    ),
+}
+
+# All trace types known to plotly.js; used to tell `type:"heatmap"` apart from `type:"line"`
+# (shapes) or `type:"log"` (axes) when scanning module JS.
+TRACE_TYPES = frozenset(
+    {
+        "bar", "barpolar", "box", "candlestick", "carpet", "choropleth", "choroplethmap",
+        "choroplethmapbox", "cone", "contour", "contourcarpet", "densitymap", "densitymapbox",
+        "funnel", "funnelarea", "heatmap", "histogram", "histogram2d", "histogram2dcontour",
+        "icicle", "image", "indicator", "isosurface", "mesh3d", "ohlc", "parcats", "parcoords",
+        "pie", "sankey", "scatter", "scatter3d", "scattercarpet", "scattergeo", "scattergl",
+        "scattermap", "scattermapbox", "scatterpolar", "scatterpolargl", "scattersmith",
+        "scatterternary", "splom", "streamtube", "sunburst", "surface", "table", "treemap",
+        "violin", "volume", "waterfall",
+    }
+)
+
+_JS_TYPE_RE = re.compile(r"""\btype\s*:\s*["']([a-z0-9]+)["']""")
+_VERSION_RE = re.compile(r"plotly\.js v(\d+\.\d+\.\d+)")
+
+
+def figure_trace_types(figures_json: str) -> set[str]:
+    """Trace types of a module's figure specs (a trace without `type` is a scatter)."""
+    return {t.get("type", "scatter") for f in json.loads(figures_json) for t in f.get("data", [])}
+
+
+def js_trace_types(js: str) -> set[str]:
+    """Trace types a module's JS may create itself (e.g. via `Plotly.react` with new traces)."""
+    return {t for t in _JS_TYPE_RE.findall(js) if t in TRACE_TYPES}
+
+
+def full_bundle() -> Traversable:
+    """What plotly.offline.get_plotlyjs() returns, as a file so it can be streamed into the page."""
+    return resources.files("plotly") / "package_data" / "plotly.min.js"
+
+
+def _head(path: Path | Traversable) -> str:
+    # a stray binary file must not crash the build, only fail the version check
+    with path.open("r", encoding="utf-8", errors="replace") as f:
+        return f.read(200)
+
+
+def plotlyjs_version() -> str | None:
+    """Version of the plotly.js bundled with plotly.py (the figure JSON targets this one)."""
+    m = _VERSION_RE.search(_head(full_bundle()))
+    return m.group(1) if m else None
+
+
+def select_bundle(trace_types: Iterable[str]) -> str:
+    """Smallest partial bundle containing every trace type, or "full"."""
+    needed = set(trace_types)
+    for name, types in PARTIAL_BUNDLES.items():
+        if needed <= types:
+            return name
+    return "full"
+
+
+def _cdn_url(bundle: str, version: str | None) -> str:
+    name = "plotly" if bundle == "full" else f"plotly-{bundle}"
+    return f"{CDN_BASE}/{name}-{version or 'latest'}.min.js"
+
+
+def cdn_src(trace_types: Iterable[str]) -> str:
+    """CDN URL of the smallest bundle for these trace types (debug builds; no vendoring needed)."""
+    return _cdn_url(select_bundle(trace_types), plotlyjs_version())
+
+
+def fetch_bundle(bundle: str, sha256: str, *, vendor_dir: Path = VENDOR_DIR) -> Path:
+    """
+    Download the partial `bundle` at plotly.py's plotly.js version from the CDN into `vendor_dir`,
+    where `resolve` picks it up; returns its path. Only used by `fetch_plotly.py`, never by a build.
+
+    The download must hash to `sha256` (pinned by the caller, e.g. from the npm package's
+    `dist.integrity`) and carry the matching version header; otherwise `ValueError` and nothing
+    is written.
+    """
+    if bundle not in PARTIAL_BUNDLES:
+        raise ValueError(f"unknown partial bundle {bundle!r} (expected one of {', '.join(PARTIAL_BUNDLES)})")
+    version = plotlyjs_version()
+    if version is None:
+        raise ValueError("could not read the plotly.js version")
+    url = _cdn_url(bundle, version)
+    with urllib.request.urlopen(url, timeout=_FETCH_TIMEOUT_S) as r:
+        data = r.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != sha256.lower():
+        raise ValueError(f"{url}: sha256 {digest} does not match the pinned {sha256}")
+    m = _VERSION_RE.search(data[:200].decode("utf-8", errors="replace"))
+    if m is None or m.group(1) != version:
+        raise ValueError(f"{url} is not plotly.js v{version}")
+    path = vendor_dir / f"plotly-{bundle}-{version}.min.js"
+    vendor_dir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp{os.getpid()}")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path
+
+
+@dataclass(frozen=True)
+class PlotlyJS:
+    bundle: str
+    version: str | None
+    trace_types: tuple[str, ...]
+    # vendored partial bundle, or plotly.py's full bundle
+    path: Path | Traversable
+    note: str
+
+    def nbytes(self) -> int:
+        with self.path.open("rb") as f:
+            return f.seek(0, 2)
+
+    def chunks(self, size: int = 1 << 20) -> Iterator[str]:
+        """The source in pieces, so the page can be streamed without holding it all at once."""
+        with self.path.open("r", encoding="utf-8") as f:
+            while chunk := f.read(size):
+                yield chunk
+
+    def source(self) -> str:
+        return "".join(self.chunks())
+
+    def report(self) -> dict[str, object]:
+        return {
+            "bundle": self.bundle,
+            "version": self.version,
+            "trace_types": list(self.trace_types),
+            "path": str(self.path),
+            "note": self.note,
+        }
+
+
+def resolve(trace_types: Iterable[str], *, vendor_dir: Path = VENDOR_DIR) -> PlotlyJS:
+    """
+    Pick the plotly.js to ship for these trace types.
+
+    Uses `vendor/plotly/plotly-<bundle>-<version>.min.js` (e.g. from the npm package
+    `plotly.js-cartesian-dist-min`) when a partial bundle covers every trace type and its version
+    matches plotly.py's bundled plotly.js (`fetch_plotly.py` downloads one, checked against a
+    pinned sha256); otherwise falls back to the full bundle. Never touches the network.
+    """
+    types = tuple(sorted(set(trace_types)))
+    version = plotlyjs_version()
+    bundle = select_bundle(types)
+
+    def full(note: str) -> PlotlyJS:
+        return PlotlyJS("full", version, types, full_bundle(), note)
+
+    if bundle == "full":
+        return full("no partial bundle covers these trace types")
+    if version is None:
+        return full("could not read the plotly.js version")
+    path = vendor_dir / f"plotly-{bundle}-{version}.min.js"
+    if not path.exists():
+        return full(f"{path.name} not vendored; using the full bundle")
+    m = _VERSION_RE.search(_head(path))
+    if m is None or m.group(1) != version:
+        found = f"plotly.js v{m.group(1)}" if m else "not a plotly.js dist file"
+        return full(f"{path.name} is {found}")
+    return PlotlyJS(bundle, version, types, path, "vendored partial bundle")
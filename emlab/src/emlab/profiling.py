@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Iterator
+
+
+def nbytes(text: str | bytes) -> int:
+    """Size as written to the page (UTF-8)."""
+    return len(text) if isinstance(text, bytes) else len(text.encode("utf-8"))
+
+
+class PhaseTimer:
+    """
+    Records named phases as wall-clock durations plus Chrome trace events.
+
+    Cheap enough to create in worker processes; the events carry the real pid so a parallel
+    build shows one row per worker in chrome://tracing / Perfetto.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, Any]] = []
+        self.durations: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str, **args: Any) -> Iterator[None]:
+        t0 = time.time_ns()
+        try:
+            yield
+        finally:
+            t1 = time.time_ns()
+            self.durations[name] = self.durations.get(name, 0.0) + (t1 - t0) / 1e9
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": "build",
+                    "ph": "X",
+                    "ts": t0 // 1000,
+                    "dur": max(1, (t1 - t0) // 1000),
+                    "pid": os.getpid(),
+                    "tid": threading.get_native_id(),
+                    "args": args,
+                }
+            )
+
+
+def phase(timer: PhaseTimer | None, name: str, **args: Any) -> ContextManager[None]:
+    """`timer.phase(...)` when profiling, a no-op otherwise."""
+    return timer.phase(name, **args) if timer is not None else nullcontext()
+
+
+class BuildProfiler(PhaseTimer):
+    """
+    Collects the `--profile` build report.
+
+    Per module: build()/figure/payload timings, tracemalloc peak and output bytes. Page level:
+    phase timings and the bytes of the inlined Plotly/MathJax assets. Other build stages can
+    attach their own sections via `section()`.
+    """
+
+    def __init__(self, *, pstats_dir: str | Path | None = None) -> None:
+        super().__init__()
+        self.pstats_dir = Path(pstats_dir) if pstats_dir else None
+        self.modules: list[dict[str, Any]] = []
+        self.assets: dict[str, int] = {}
+        self.sections: dict[str, Any] = {}
+
+    def add_module(self, stats: dict[str, Any]) -> None:
+        stats = dict(stats)
+        self.events.extend(stats.pop("events", []))
+        self.modules.append(stats)
+
+    def section(self, name: str) -> dict[str, Any]:
+        return self.sections.setdefault(name, {})
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "phases_s": {k: round(v, 4) for k, v in self.durations.items()},
+            "modules": self.modules,
+            "assets_bytes": self.assets,
+            **self.sections,
+        }
+
+    def write(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.report(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def write_trace(self, path: str | Path) -> None:
+        events = sorted(self.events, key=lambda e: e["ts"])
+        Path(path).write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
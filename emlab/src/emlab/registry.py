@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import importlib
+from typing import Any, Callable, Iterable
+
+# Registered modules (`emlab.modules.<name>`), in navigation order. Nothing is imported here:
+# a module and its dependencies (plotly, scipy, ...) are only loaded when it is built.
+MODULES: tuple[str, ...] = (
+    "crt_scope",
+    "xct_ct",
+    "ac_motor",
+    "rail_launcher",
+    "mass_spec",
+    "electron_microscope",
+    "cyclotron",
+    "linac",
+    "transformer",
+    "rlc_oscillation",
+    "wireless_power",
+    "hall_effect",
+    "speaker_microphone",
+    "induction_heating",
+)
+
+
+def parse_names(text: str) -> list[str]:
+    """`"crt_scope, linac"` -> `["crt_scope", "linac"]` (validated)."""
+    names = [n.strip() for n in text.split(",") if n.strip()]
+    unknown = [n for n in names if n not in MODULES]
+    if unknown:
+        raise ValueError(f"unknown module(s) {', '.join(unknown)}; available: {', '.join(MODULES)}")
+    return names
+
+
+def select(*, only: Iterable[str] | None = None, exclude: Iterable[str] = ()) -> list[str]:
+    """Registered names to build, in navigation order."""
+    wanted = set(MODULES if only is None else parse_names(",".join(only)))
+    wanted -= set(parse_names(",".join(exclude)))
+    return [name for name in MODULES if name in wanted]
+
+
+def builder(name: str) -> Callable[[], dict[str, Any]]:
+    """Import `emlab.modules.<name>` and return its `build`."""
+    return importlib.import_module(f"emlab.modules.{name}").build
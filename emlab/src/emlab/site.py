@@ -1,33 +1,102 @@
 from __future__ import annotations
 
+import base64
+import cProfile
+import hashlib
 import html
 import json
+import os
 import re
-from dataclasses import dataclass
+import sys
+import time
+import tracemalloc
+import zlib
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterable, Iterator
 
-import plotly.io as pio
 from jinja2 import Template
-from plotly.offline import get_plotlyjs
-
-from emlab.modules import (
-    ac_motor,
-    crt_scope,
-    cyclotron,
-    electron_microscope,
-    hall_effect,
-    induction_heating,
-    linac,
-    mass_spec,
-    rail_launcher,
-    rlc_oscillation,
-    speaker_microphone,
-    transformer,
-    wireless_power,
-    xct_ct,
-)
+
+from emlab import plotlyjs, registry
+from emlab.buildcache import DEFAULT_MAX_BYTES, BuildCache
+from emlab.common import figspec
+from emlab.minify import minify_css, minify_html, minify_js
+from emlab.profiling import BuildProfiler, PhaseTimer, nbytes, phase
+
+
+# ndarrays with at least this many elements are emitted as base64 typed arrays (binary payloads);
+# smaller ones stay plain JSON lists, where the marker/base64 overhead would not pay off.
+_ND_MIN_SIZE = 256
+# dtype codes the page can view directly as a TypedArray (little-endian).
+_ND_CODES = ("f4", "f8", "i1", "u1", "i2", "u2", "i4", "u4")
+
+
+def _typed_array(arr: Any) -> tuple[str, Any] | None:
+    """(dtype code, little-endian contiguous copy) if `arr` should reach the page as a TypedArray."""
+    import numpy as np
+
+    code = f"{arr.dtype.kind}{arr.dtype.itemsize}"
+    if code in ("i8", "u8"):
+        # no 64-bit integer TypedArray without BigInt
+        arr, code = arr.astype(np.float64), "f8"
+    if code not in _ND_CODES or arr.size < _ND_MIN_SIZE:
+        return None
+    return code, np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<"))
+
+
+# ndarray rows longer than this are converted to Python numbers a slice at a time (json payloads)
+_ND_TEXT_CHUNK = 1 << 16
+# bytes base64-encoded per step (a multiple of 3, so the pieces concatenate without padding)
+_ND_B64_CHUNK = 3 << 18
+
+
+def _nd_text(arr: Any) -> Iterator[str]:
+    """
+    ndarray -> the JSON text `_json_scalar(arr.tolist())` would give, one row (or row slice) at a
+    time, so only that many Python numbers exist at once.
+    """
+    if arr.ndim == 0:
+        yield _json_scalar(arr.item())
+    elif arr.ndim > 1:
+        yield "["
+        for i, sub in enumerate(arr):
+            if i:
+                yield ","
+            yield from _nd_text(sub)
+        yield "]"
+    elif arr.size <= _ND_TEXT_CHUNK:
+        yield _json_scalar(arr.tolist())
+    else:
+        yield "["
+        for start in range(0, arr.size, _ND_TEXT_CHUNK):
+            if start:
+                yield ","
+            yield _json_scalar(arr[start : start + _ND_TEXT_CHUNK].tolist())[1:-1]
+        yield "]"
+
+
+def _nd_binary(arr: Any) -> Iterator[str]:
+    """
+    ndarray -> {"__nd__": dtype, "shape": [...], "b64": ...}, decoded by `emlabGetJSON` in the page
+    into nested Arrays whose innermost rows are TypedArray views over one buffer.
+
+    The base64 text is encoded straight from the array's buffer, a slice at a time.
+    """
+    import numpy as np
+
+    typed = _typed_array(arr)
+    if typed is None:
+        yield from _nd_text(arr)
+        return
+    code, arr = typed
+    buf = arr.reshape(-1).view(np.uint8)
+    yield f'{{"__nd__":"{code}","shape":{json.dumps(list(arr.shape), separators=(",", ":"))},"b64":"'
+    for start in range(0, buf.size, _ND_B64_CHUNK):
+        yield base64.b64encode(buf[start : start + _ND_B64_CHUNK]).decode("ascii")
+    yield '"}'
 
 
 def _json_default(obj: Any) -> Any:
@@ -39,14 +108,47 @@ def _json_default(obj: Any) -> Any:
         if isinstance(obj, (np.floating,)):
             return float(obj)
         if isinstance(obj, (np.ndarray,)):
-            return obj.tolist()
+            return obj.tolist()  # 0-d arrays; larger ones never reach json.dumps (see _iter_json)
     except Exception:
         pass
     raise TypeError(f"Not JSON serializable: {type(obj)}")
 
 
-def _dumps(data: Any) -> str:
-    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+def _json_scalar(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+
+def _iter_json(data: Any, nd: Callable[[Any], Iterator[str]]) -> Iterator[str]:
+    """
+    `json.dumps(data)` as a stream of text pieces, with every ndarray written by `nd` straight
+    from its buffer instead of going through `tolist()`.
+    """
+    if isinstance(data, dict):
+        yield "{"
+        for i, (key, value) in enumerate(data.items()):
+            # json.dumps turns int/float/bool/None keys into their JSON text
+            yield ("," if i else "") + _json_scalar(key if isinstance(key, str) else _json_scalar(key)) + ":"
+            yield from _iter_json(value, nd)
+        yield "}"
+    elif isinstance(data, (list, tuple)):
+        if not any(isinstance(v, (dict, list, tuple)) or getattr(v, "ndim", 0) > 0 for v in data):
+            yield _json_scalar(data)
+            return
+        yield "["
+        for i, value in enumerate(data):
+            if i:
+                yield ","
+            yield from _iter_json(value, nd)
+        yield "]"
+    elif getattr(data, "ndim", 0) > 0:
+        yield from nd(data)
+    else:
+        yield _json_scalar(data)
+
+
+def _dumps(data: Any, *, binary: bool = False) -> str:
+    """Compact JSON; ndarrays as base64 typed arrays (`binary`) or number lists."""
+    return "".join(_iter_json(data, _nd_binary if binary else _nd_text))
 
 
 def _split_md_sections(md: str) -> dict[str, str]:
@@ -282,12 +384,39 @@ def _load_formulas_html() -> dict[str, str]:
     return {k: _md_to_html(v) for k, v in sections.items()}
 
 
-def _load_mathjax_inline() -> str | None:
+def _mathjax_path() -> Path | None:
     repo_root = Path(__file__).resolve().parents[3]
     path = repo_root / "vendor" / "mathjax" / "tex-svg.js"
-    if not path.exists():
-        return None
-    return path.read_text(encoding="utf-8")
+    return path if path.exists() else None
+
+
+def _text_chunks(path: Path, size: int = 1 << 20) -> Iterator[str]:
+    """A large vendored asset in pieces, so it is streamed into the page rather than held whole."""
+    with path.open("r", encoding="utf-8") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+_PLOTLY_CONFIG: dict[str, Any] = {
+    "responsive": True,
+    "displaylogo": False,
+    "modeBarButtonsToRemove": ["lasso2d", "select2d"],
+}
+
+
+@dataclass(frozen=True)
+class BundleOptions:
+    """Options that change a rendered ModuleBundle (and therefore its cache key)."""
+
+    config: dict[str, Any] = field(default_factory=lambda: dict(_PLOTLY_CONFIG))
+    # "binary": ndarrays as base64 typed arrays; "json": plain number lists
+    payload: str = "binary"
+    # deflate each data block (base64 in the page, inflated on first use)
+    compress: bool = False
+    # minify module JS and HTML (release builds)
+    minify: bool = False
+    # check every figure spec with plotly.graph_objects (debug builds)
+    validate_figures: bool = False
 
 
 @dataclass(frozen=True)
@@ -296,50 +425,314 @@ class ModuleBundle:
     title: str
     intro_html: str
     controls_html: str
-    figures_html: list[str]
+    # placeholder div ids; the figures are created from `figures_json` when the module is hydrated
+    figure_ids: list[str]
+    figures_json: str
     data_json: str
     js: str
     pitfalls_html: str
     questions_html: str
+    # "json": data_json is JSON text; "deflate": see `_compress_data`
+    data_encoding: str = "json"
+    # (name, text) of the module's `data_blocks`, encoded like data_json; the page only decodes a
+    # block when the module JS asks for it (`emlabGetData`)
+    data_blocks: tuple[tuple[str, str], ...] = ()
 
 
-def _render_figures(module_id: str, figures: list[Any], *, config: dict[str, Any]) -> list[str]:
-    html_parts: list[str] = []
+def _compress_data(data: Any, *, binary: bool) -> str:
+    """
+    Deflated data block: base64(zlib([u32 LE json length][json][raw array bytes])).
+
+    With binary payloads the arrays go to the raw tail instead of base64 strings, byte-shuffled
+    (all first bytes, then all second bytes, ...), which deflates much better for float data.
+    The page decodes it with `emlabPrepareData`.
+    """
+    import numpy as np
+
+    raw: list[bytes] = []
+    offset = 0
+
+    def nd(arr: Any) -> Iterator[str]:
+        nonlocal offset
+        typed = _typed_array(arr) if binary else None
+        if typed is None:
+            yield from _nd_text(arr)
+            return
+        code, arr = typed
+        shuffled = arr.view(np.uint8).reshape(-1, arr.itemsize).T.tobytes()
+        raw.append(shuffled)
+        yield f'{{"__nd__":"{code}","shape":{json.dumps(list(arr.shape), separators=(",", ":"))},"off":{offset}}}'
+        offset += len(shuffled)
+
+    text = "".join(_iter_json(data, nd)).encode("utf-8")
+    blob = b"".join([len(text).to_bytes(4, "little"), text, *raw])
+    return base64.b64encode(zlib.compress(blob, 9)).decode("ascii")
+
+
+def _render_figures(
+    module_id: str,
+    figures: list[Any],
+    *,
+    config: dict[str, Any],
+    validate: bool = False,
+    payload: dict[str, Any] | None = None,
+) -> tuple[list[str], str]:
+    """
+    Placeholder div ids plus one JSON list of `{data, layout, config}` specs.
+
+    Modules build their figures as plain dicts (`emlab.common.figspec`); `validate` runs each
+    one through `plotly.graph_objects.Figure` first, with its `figspec.ref(...)` arrays looked
+    up in `payload`. Nothing is plotted at page load:
+    `emlabHydrate` calls `Plotly.newPlot` for a module's figures the first time its section is
+    shown.
+    """
+    div_ids: list[str] = []
+    specs: list[dict[str, Any]] = []
     for i, fig in enumerate(figures):
-        div_id = f"fig-{module_id}-{i}"
-        html_parts.append(
-            pio.to_html(
-                fig,
-                full_html=False,
-                include_plotlyjs=False,
-                config=config,
-                div_id=div_id,
-                default_width="100%",
-                default_height="100%",
-                auto_play=False,
-            )
-        )
-    return html_parts
+        div_ids.append(f"fig-{module_id}-{i}")
+        fig_dict = fig if isinstance(fig, dict) else fig.to_plotly_json()
+        if validate:
+            try:
+                figspec.validate(figspec.resolve(fig_dict, payload or {}))
+            except ValueError as e:
+                raise ValueError(f"{module_id}: figure {i} is not a valid plotly figure: {e}") from None
+        specs.append({"data": fig_dict.get("data", []), "layout": fig_dict.get("layout", {}), "config": config})
+    from plotly.io.json import to_json_plotly
+
+    return div_ids, to_json_plotly(specs)
+
+
+_JS_TEMPLATE_RE = re.compile(r"""\bemlabTemplate\(\s*["']([\w-]+)["']\s*\)""")
+
 
+def _template_names(bundle: ModuleBundle) -> set[str]:
+    """Plotly templates a module refers to by name (figure layouts, `emlabTemplate("...")` in its JS)."""
+    names = {f["layout"].get("template") for f in json.loads(bundle.figures_json)}
+    return {n for n in names if isinstance(n, str)} | set(_JS_TEMPLATE_RE.findall(bundle.js))
 
-def _bundle(module_dict: dict[str, Any], *, config: dict[str, Any]) -> ModuleBundle:
+
+def _templates_report(modules: list[ModuleBundle], templates_json: str) -> dict[str, Any]:
+    """Bytes the shared template block saves over inlining it into every figure that names it."""
+    per_name = {n: nbytes(_dumps(figspec.template(n))) for n in json.loads(templates_json)}
+    figures = sum(
+        1 for m in modules for f in json.loads(m.figures_json) if f["layout"].get("template") in per_name
+    )
+    inlined = figures * max(per_name.values(), default=0)
+    return {
+        "names": sorted(per_name),
+        "figures": figures,
+        "shared_bytes": nbytes(templates_json),
+        "bytes_saved": inlined - nbytes(templates_json),
+    }
+
+
+def _render_figures_go(figures: list[Any], *, config: dict[str, Any]) -> str:
+    """The same JSON through `go.Figure` objects (the pre-figspec path; kept for --profile)."""
+    import plotly.graph_objects as go
+    from plotly.io.json import to_json_plotly
+
+    specs = []
+    for fig in figures:
+        fig_dict = go.Figure(fig).to_plotly_json()
+        specs.append({"data": fig_dict["data"], "layout": fig_dict["layout"], "config": config})
+    return to_json_plotly(specs)
+
+
+_HTML_FIELDS = ("intro_html", "controls_html", "pitfalls_html", "questions_html")
+
+
+def _bundle(
+    module_dict: dict[str, Any], *, options: BundleOptions, timer: PhaseTimer | None = None
+) -> ModuleBundle:
     figures = module_dict["figures"]
     module_id = module_dict["id"]
+    payload = module_dict.get("data_payload", {})
+    with phase(timer, "render_figures", module=module_id):
+        figure_ids, figures_json = _render_figures(
+            module_id, figures, config=options.config, validate=options.validate_figures, payload=payload
+        )
+    blocks = module_dict.get("data_blocks", {})
+    for name in blocks:
+        if not re.fullmatch(r"\w+", name):
+            raise ValueError(f"{module_id}: data block name {name!r} is not a word (letters, digits, _)")
+    with phase(timer, "dumps", module=module_id):
+        encode = _compress_data if options.compress else _dumps
+        data_json = encode(payload, binary=options.payload == "binary")
+        data_blocks = tuple((name, encode(block, binary=options.payload == "binary")) for name, block in blocks.items())
+    js = module_dict.get("js", "")
+    html_parts = {k: module_dict.get(k, "") for k in _HTML_FIELDS}
+    if options.minify:
+        with phase(timer, "minify", module=module_id):
+            js = minify_js(js)
+            html_parts = {k: minify_html(v) for k, v in html_parts.items()}
     return ModuleBundle(
         id=module_id,
         title=module_dict["title"],
-        intro_html=module_dict["intro_html"],
-        controls_html=module_dict["controls_html"],
-        figures_html=_render_figures(module_id, figures, config=config),
-        data_json=_dumps(module_dict.get("data_payload", {})),
-        js=module_dict.get("js", ""),
-        pitfalls_html=module_dict.get("pitfalls_html", ""),
-        questions_html=module_dict.get("questions_html", ""),
+        figure_ids=figure_ids,
+        figures_json=figures_json,
+        data_json=data_json,
+        js=js,
+        **html_parts,
+        data_encoding="deflate" if options.compress else "json",
+        data_blocks=data_blocks,
     )
 
 
-TEMPLATE = Template(
-    r"""<!doctype html>
+def _build_module(builder: Callable[[], dict[str, Any]], options: BundleOptions) -> ModuleBundle:
+    """
+    Run one module builder and render its bundle.
+
+    Module-level so it can be shipped to a worker process (builders are pickled by reference).
+    """
+    return _bundle(builder(), options=options)
+
+
+def _clear_caches() -> None:
+    """Empty every `lru_cache` in emlab's modules, so a repeated build does the same work again."""
+    for name, mod in list(sys.modules.items()):
+        if name == "emlab" or name.startswith("emlab."):
+            for obj in vars(mod).values():
+                if callable(getattr(obj, "cache_clear", None)):
+                    obj.cache_clear()
+
+
+def _profile_module(
+    builder: Callable[[], dict[str, Any]], options: BundleOptions, pstats_dir: Path | None = None
+) -> tuple[ModuleBundle, dict[str, Any]]:
+    """
+    `_build_module` plus timings, tracemalloc peak, output sizes and an optional cProfile dump.
+
+    The module is built twice: once uninstrumented for the wall times (tracemalloc alone makes
+    `_bundle` several times slower), then again with cold caches under tracemalloc (and
+    cProfile) for the peak and pstats.
+    """
+    timer = PhaseTimer()
+    with timer.phase("build", module=builder.__module__):
+        module_dict = builder()
+    bundle = _bundle(module_dict, options=options, timer=timer)
+
+    _clear_caches()
+    prof = cProfile.Profile() if pstats_dir is not None else None
+    tracemalloc.start()
+    if prof is not None:
+        prof.enable()
+    try:
+        _bundle(builder(), options=options)
+    finally:
+        if prof is not None:
+            prof.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    # the figures with every figspec.ref array inlined, as they were before refs
+    payload = module_dict.get("data_payload", {})
+    inlined = [figspec.resolve(f, payload) for f in module_dict["figures"]]
+    # what rendering the same figures used to cost with validated plotly.graph_objects
+    with timer.phase("render_figures_go", module=bundle.id):
+        _render_figures_go(inlined, config=options.config)
+    stats: dict[str, Any] = {
+        "id": bundle.id,
+        "build_s": round(timer.durations["build"], 4),
+        "render_figures_s": round(timer.durations["render_figures"], 4),
+        "render_figures_go_s": round(timer.durations["render_figures_go"], 4),
+        "dumps_s": round(timer.durations["dumps"], 4),
+        "tracemalloc_peak_bytes": peak,
+        # figspec.heatmap matrices drawn as PNG image traces
+        "image_traces": sum(
+            t.get("type") == "image" for f in json.loads(bundle.figures_json) for t in f.get("data", [])
+        ),
+        "bytes": {
+            "figures_json": nbytes(bundle.figures_json),
+            "data_json": nbytes(bundle.data_json),
+            "data_blocks": {name: nbytes(text) for name, text in bundle.data_blocks},
+            "js": nbytes(bundle.js),
+            "html": sum(nbytes(getattr(bundle, k)) for k in _HTML_FIELDS),
+        },
+        "events": timer.events,
+    }
+    # arrays the figures take from data_payload instead of carrying a second copy
+    _, inlined_json = _render_figures(bundle.id, inlined, config=options.config)
+    stats["figure_refs_saved_bytes"] = nbytes(inlined_json) - stats["bytes"]["figures_json"]
+    if options.minify:
+        stats["minify_s"] = round(timer.durations["minify"], 4)
+        stats["minify_saved_bytes"] = {
+            "js": nbytes(module_dict.get("js", "")) - stats["bytes"]["js"],
+            "html": sum(nbytes(module_dict.get(k, "")) for k in _HTML_FIELDS) - stats["bytes"]["html"],
+        }
+    if prof is not None and pstats_dir is not None:
+        pstats_dir.mkdir(parents=True, exist_ok=True)
+        stats["pstats"] = str(pstats_dir / f"{bundle.id}.pstats")
+        prof.dump_stats(stats["pstats"])
+    return bundle, stats
+
+
+def _build_modules(
+    builders: list[Callable[[], dict[str, Any]]],
+    *,
+    options: BundleOptions,
+    jobs: int = 1,
+    cache: BuildCache | None = None,
+    profiler: BuildProfiler | None = None,
+) -> list[ModuleBundle]:
+    """
+    Build all module bundles, optionally in a process pool and/or through the on-disk cache.
+
+    Results are always returned in registration order, so the page is identical to a serial build.
+    When profiling, cached bundles are not reused (so every module is measured) but fresh ones are
+    still stored.
+    """
+    keys = [cache.key(b, asdict(options)) if cache else None for b in builders]
+    modules: list[ModuleBundle | None] = [None] * len(builders)
+    if profiler is None:
+        modules = [cache.get(k) if cache and k else None for k in keys]
+    todo = [i for i, m in enumerate(modules) if m is None]
+
+    worker: Callable[..., Any] = _build_module
+    if profiler is not None:
+        worker = partial(_profile_module, pstats_dir=profiler.pstats_dir)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(todo))
+    if jobs <= 1:
+        built = [worker(builders[i], options) for i in todo]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            built = list(ex.map(worker, [builders[i] for i in todo], repeat(options)))
+
+    for i, result in zip(todo, built):
+        if profiler is not None:
+            result, stats = result
+            profiler.add_module(stats)
+        modules[i] = result
+        if cache and keys[i]:
+            cache.put(keys[i], result)
+    if cache:
+        cache.evict()
+    return [m for m in modules if m is not None]
+
+
+def _attach_formulas(bundle: ModuleBundle, formulas_html: dict[str, str]) -> ModuleBundle:
+    """
+    Append the collapsed formula panel to the module intro.
+
+    The shared `_global` section is not copied into every panel: the page keeps it once in
+    `<template id="formula-global">` and fills the empty `.formula-global` slot when a panel is opened.
+    """
+    global_html = (formulas_html.get("_global") or "").strip()
+    body_html = (formulas_html.get(bundle.id) or "").strip()
+    if not (global_html or body_html):
+        return bundle
+    parts: list[str] = ['<details class="formula">', "<summary>公式推演（展开）</summary>"]
+    if global_html:
+        parts.append('<div class="formula-global tex2jax_process"></div>')
+    if body_html:
+        parts.append(f'<div class="formula-body tex2jax_process">{body_html}</div>')
+    parts.append("</details>")
+    return replace(bundle, intro_html=(bundle.intro_html or "") + "\n" + "\n".join(parts))
+
+
+_TEMPLATE_SRC = r"""<!doctype html>
 <html lang="zh-CN">
   <head>
     <meta charset="utf-8" />
@@ -628,12 +1021,14 @@ TEMPLATE = Template(
       }
     </style>
     {% if plotly_inline %}
-    <script>{{ plotly_inline|safe }}</script>
+    <script>{% for chunk in plotly_inline %}{{ chunk|safe }}{% endfor %}</script>
     {% else %}
-    <script src="{{ plotly_cdn_src }}"></script>
+    <script src="{{ plotly_src }}"></script>
     {% endif %}
-    {% if mathjax_inline %}
+    {% if mathjax_inline or mathjax_src %}
     <script>
+      // MathJax is kept inert (#mathjax-src, or a separate asset in split builds) and only started
+      // when a formula panel is opened.
       window.MathJax = {
         tex: {
           inlineMath: [['$','$'], ['\\(','\\)']],
@@ -646,10 +1041,16 @@ TEMPLATE = Template(
         options: {
           ignoreHtmlClass: 'tex2jax_ignore',
           processHtmlClass: 'tex2jax_process'
+        },
+        startup: {
+          typeset: false,
+          pageReady: () => MathJax.startup.defaultPageReady().then(() => window.emlabMathJaxReady())
         }
       };
     </script>
-    <script>{{ mathjax_inline|safe }}</script>
+    {% if mathjax_inline %}
+    <script type="text/plain" id="mathjax-src">{% for chunk in mathjax_inline %}{{ chunk|safe }}{% endfor %}</script>
+    {% endif %}
     {% endif %}
   </head>
   <body>
@@ -662,15 +1063,15 @@ TEMPLATE = Template(
             生成时间：{{ build_time }}
           </div>
         </div>
-        {% for m in modules %}
-          <button class="navbtn" id="nav-{{m.id}}" data-module="{{m.id}}">{{ m.title }}</button>
+        {% for module_id, title in nav %}
+          <button class="navbtn" id="nav-{{module_id}}" data-module="{{module_id}}">{{ title }}</button>
         {% endfor %}
       </nav>
       <main>
         {% for m in modules %}
         <section class="module" id="section-{{m.id}}">
           <h2>{{ m.title }}</h2>
-          <div class="intro{% if mathjax_inline %} tex2jax_process{% endif %}">{{ m.intro_html|safe }}</div>
+          <div class="intro{% if mathjax_inline or mathjax_src %} tex2jax_process{% endif %}">{{ m.intro_html|safe }}</div>
           <div class="grid">
             <div class="card controls">
               <h3>参数</h3>
@@ -682,9 +1083,9 @@ TEMPLATE = Template(
             <div class="card">
               <h3>图表</h3>
               <div class="figgrid">
-                {% for fig_html in m.figures_html %}
+                {% for fig_id in m.figure_ids %}
                 <div class="figcard">
-                  <div class="figbody">{{ fig_html|safe }}</div>
+                  <div class="figbody"><div id="{{ fig_id }}" class="plotly-graph-div" style="height:100%; width:100%;"></div></div>
                 </div>
                 {% endfor %}
               </div>
@@ -692,28 +1093,305 @@ TEMPLATE = Template(
             </div>
           </div>
           <div class="below">
-            <div class="card{% if mathjax_inline %} tex2jax_process{% endif %}">
+            <div class="card{% if mathjax_inline or mathjax_src %} tex2jax_process{% endif %}">
               <h3>常见误区</h3>
               {{ m.pitfalls_html|safe }}
             </div>
-            <div class="card{% if mathjax_inline %} tex2jax_process{% endif %}">
+            <div class="card{% if mathjax_inline or mathjax_src %} tex2jax_process{% endif %}">
               <h3>引导问题</h3>
               {{ m.questions_html|safe }}
             </div>
           </div>
 
+          {% if m.id not in chunks %}
+          <script type="application/json" id="figs-{{m.id}}">{{ m.figures_json|safe }}</script>
+          {% if m.data_encoding == "json" %}
           <script type="application/json" id="data-{{m.id}}">{{ m.data_json }}</script>
+          {% for name, text in m.data_blocks %}
+          <script type="application/json" id="data-{{m.id}}-{{name}}">{{ text }}</script>
+          {% endfor %}
+          {% else %}
+          <script type="application/octet-stream" id="data-{{m.id}}" data-encoding="{{ m.data_encoding }}">{{ m.data_json }}</script>
+          {% for name, text in m.data_blocks %}
+          <script type="application/octet-stream" id="data-{{m.id}}-{{name}}" data-encoding="{{ m.data_encoding }}">{{ text }}</script>
+          {% endfor %}
+          {% endif %}
+          {% if lazy and m.js %}
+          <script type="text/plain" id="js-{{m.id}}">{{ m.js|safe }}</script>
+          {% endif %}
+          {% endif %}
         </section>
         {% endfor %}
       </main>
     </div>
+    <script type="application/json" id="plotly-templates">{{ templates_json|safe }}</script>
+    {% if formula_global_html %}
+    <template id="formula-global">{{ formula_global_html|safe }}</template>
+    {% endif %}
 
     <script>
       // ------- Common helpers -------
-      function emlabGetJSON(id){
+      const EMLAB_ND_TYPES = {
+        f4: Float32Array, f8: Float64Array, i1: Int8Array, u1: Uint8Array,
+        i2: Int16Array, u2: Uint16Array, i4: Int32Array, u4: Uint32Array
+      };
+      function emlabB64Bytes(b64){
+        const bin = atob(b64);
+        const n = bin.length;
+        const out = new Uint8Array(n);
+        for(let i=0;i<n;i++) out[i] = bin.charCodeAt(i);
+        return out;
+      }
+      function emlabUnshuffle(src, size){
+        const n = src.length / size;
+        const out = new Uint8Array(src.length);
+        for(let b=0;b<size;b++){
+          const base = b*n;
+          for(let i=0;i<n;i++) out[i*size + b] = src[base + i];
+        }
+        return out;
+      }
+      function emlabDecodeND(v, raw){
+        // {"__nd__": dtype, shape, b64 | off} -> nested Arrays, innermost rows are TypedArray views
+        // over one buffer, so module code can keep indexing data.grid[i][j][k] as before.
+        const T = EMLAB_ND_TYPES[v.__nd__];
+        let bytes;
+        if(v.b64 !== undefined){
+          bytes = emlabB64Bytes(v.b64);
+        } else {
+          const nb = (v.shape || []).reduce((a, b) => a*b, 1) * T.BYTES_PER_ELEMENT;
+          bytes = emlabUnshuffle(raw.subarray(v.off, v.off + nb), T.BYTES_PER_ELEMENT);
+        }
+        const flat = new T(bytes.buffer);
+        const shape = v.shape || [flat.length];
+        if(shape.length <= 1) return flat;
+        const inner = shape[shape.length-1];
+        let level = [];
+        for(let i=0;i<shape.slice(0, -1).reduce((a, b) => a*b, 1);i++) level.push(flat.subarray(i*inner, (i+1)*inner));
+        for(let d=shape.length-2; d>0; d--){
+          const up = [];
+          for(let i=0;i<level.length;i+=shape[d]) up.push(level.slice(i, i+shape[d]));
+          level = up;
+        }
+        return level;
+      }
+      function emlabInflateSync(src){
+        // Minimal zlib/deflate decoder (RFC 1950/1951) for browsers without DecompressionStream.
+        const LBASE = [3,4,5,6,7,8,9,10,11,13,15,17,19,23,27,31,35,43,51,59,67,83,99,115,131,163,195,227,258];
+        const LEXT = [0,0,0,0,0,0,0,0,1,1,1,1,2,2,2,2,3,3,3,3,4,4,4,4,5,5,5,5,0];
+        const DBASE = [1,2,3,4,5,7,9,13,17,25,33,49,65,97,129,193,257,385,513,769,1025,1537,2049,3073,4097,6145,8193,12289,16385,24577];
+        const DEXT = [0,0,0,0,1,1,2,2,3,3,4,4,5,5,6,6,7,7,8,8,9,9,10,10,11,11,12,12,13,13];
+        const ORDER = [16,17,18,0,8,7,9,6,10,5,11,4,12,3,13,2,14,1,15];
+        let pos = 2, bitBuf = 0, bitCnt = 0, outLen = 0;  // skip the 2-byte zlib header
+        let out = new Uint8Array(Math.max(1024, src.length*4));
+        function need(n){
+          if(outLen + n <= out.length) return;
+          let m = out.length*2;
+          while(m < outLen + n) m *= 2;
+          const o = new Uint8Array(m);
+          o.set(out.subarray(0, outLen));
+          out = o;
+        }
+        function bits(n){
+          while(bitCnt < n){ bitBuf |= src[pos++] << bitCnt; bitCnt += 8; }
+          const v = bitBuf & ((1 << n) - 1);
+          bitBuf >>>= n; bitCnt -= n;
+          return v;
+        }
+        function huff(lengths){
+          const count = new Uint16Array(16), symbol = new Uint16Array(lengths.length), offs = new Uint16Array(16);
+          for(let i=0;i<lengths.length;i++) count[lengths[i]]++;
+          count[0] = 0;
+          for(let i=1;i<16;i++) offs[i] = offs[i-1] + count[i-1];
+          for(let i=0;i<lengths.length;i++) if(lengths[i]) symbol[offs[lengths[i]]++] = i;
+          return {count, symbol};
+        }
+        function decode(h){
+          let code = 0, first = 0, index = 0;
+          for(let len=1; len<16; len++){
+            code |= bits(1);
+            const c = h.count[len];
+            if(code - c < first) return h.symbol[index + (code - first)];
+            index += c; first = (first + c) << 1; code <<= 1;
+          }
+          throw new Error("emlabInflate: bad code");
+        }
+        let fixedLit = null, fixedDist = null, last = 0;
+        while(!last){
+          last = bits(1);
+          const type = bits(2);
+          if(type === 0){
+            bitBuf = 0; bitCnt = 0;
+            const len = src[pos] | (src[pos+1] << 8);
+            pos += 4;
+            need(len);
+            out.set(src.subarray(pos, pos + len), outLen);
+            pos += len; outLen += len;
+            continue;
+          }
+          let lit, dist;
+          if(type === 1){
+            if(!fixedLit){
+              const l = new Uint8Array(288);
+              l.fill(8, 0, 144); l.fill(9, 144, 256); l.fill(7, 256, 280); l.fill(8, 280, 288);
+              fixedLit = huff(l);
+              fixedDist = huff(new Uint8Array(30).fill(5));
+            }
+            lit = fixedLit; dist = fixedDist;
+          } else if(type === 2){
+            const nlen = bits(5) + 257, ndist = bits(5) + 1, ncode = bits(4) + 4;
+            const cl = new Uint8Array(19);
+            for(let i=0;i<ncode;i++) cl[ORDER[i]] = bits(3);
+            const ch = huff(cl);
+            const lengths = new Uint8Array(nlen + ndist);
+            for(let i=0;i<nlen+ndist;){
+              const sym = decode(ch);
+              if(sym < 16){ lengths[i++] = sym; continue; }
+              let rep = 0, val = 0;
+              if(sym === 16){ val = lengths[i-1]; rep = 3 + bits(2); }
+              else if(sym === 17) rep = 3 + bits(3);
+              else rep = 11 + bits(7);
+              while(rep--) lengths[i++] = val;
+            }
+            lit = huff(lengths.subarray(0, nlen));
+            dist = huff(lengths.subarray(nlen));
+          } else {
+            throw new Error("emlabInflate: bad block type");
+          }
+          for(;;){
+            const sym = decode(lit);
+            if(sym < 256){ need(1); out[outLen++] = sym; continue; }
+            if(sym === 256) break;
+            const li = sym - 257;
+            const len = LBASE[li] + bits(LEXT[li]);
+            const di = decode(dist);
+            const d = DBASE[di] + bits(DEXT[di]);
+            need(len);
+            for(let k=0;k<len;k++){ out[outLen] = out[outLen - d]; outLen++; }
+          }
+        }
+        return out.subarray(0, outLen);
+      }
+      async function emlabInflate(bytes){
+        if(typeof DecompressionStream === "function"){
+          try{
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("deflate"));
+            return new Uint8Array(await new Response(stream).arrayBuffer());
+          }catch(e){ /* fall back to the JS decoder */ }
+        }
+        return emlabInflateSync(bytes);
+      }
+      function emlabImageHover(st){
+        // hovertext rows for an image-trace heatmap: each cell formats its 8-bit value on access,
+        // so no per-pixel strings are built up front or on redraw
+        return Array.from({length: st.rows}, (_, r) => new Proxy([], {
+          get(arr, k){
+            if(k === "length") return st.cols;
+            const j = typeof k === "string" ? Number(k) : NaN;
+            if(!(j >= 0 && j < st.cols) || !st.q) return arr[k];
+            return emlabFmt(st.lo + st.q[r*st.cols + j] * (st.hi - st.lo) / 255, st.digits);
+          }
+        }));
+      }
+      function emlabInitImage(gd, traces){
+        // An image trace from figspec.heatmap: keep its palettes/range on the div for
+        // emlabSetHeatmap and hand plotly.js lazy hover text.
+        const t = traces[0];
+        const im = t && t.type === "image" && t.meta && t.meta.emlabImage;
+        if(!im) return Promise.resolve();
+        delete t.meta;
+        const st = gd.emlabImage = {
+          palettes: im.palettes, colorscale: im.colorscale, zmid: im.zmid, digits: im.digits,
+          lo: im.lo, hi: im.hi, rows: im.q.shape[0], cols: im.q.shape[1], q: null
+        };
+        t.hovertext = st.hover = emlabImageHover(st);
+        return emlabInflate(emlabB64Bytes(im.q.zlib)).then(q => { if(!st.q) st.q = q; });
+      }
+      function emlabSetHeatmap(gd, z, style){
+        // Redraw a figspec.heatmap figure with rows `z`; `style` ({colorscale, zmid}) as for
+        // Plotly.restyle. Image traces are colour-mapped here onto a canvas and swapped in as PNG.
+        const st = gd.emlabImage;
+        style = style || {};
+        if(!st){
+          const update = {z: [z]};
+          Object.keys(style).forEach(k => { update[k] = [style[k]]; });
+          return Plotly.restyle(gd, update, [0]);
+        }
+        if(style.colorscale !== undefined) st.colorscale = style.colorscale;
+        if(style.zmid !== undefined) st.zmid = style.zmid;
+        const rows = z.length, cols = rows ? z[0].length : 0;
+        let lo = Infinity, hi = -Infinity;
+        for(let i=0;i<rows;i++){
+          const row = z[i];
+          for(let j=0;j<cols;j++){ const v = row[j]; if(v < lo) lo = v; if(v > hi) hi = v; }
+        }
+        if(st.zmid !== null && st.zmid !== undefined){
+          const half = Math.max(Math.abs(lo - st.zmid), Math.abs(hi - st.zmid));
+          lo = st.zmid - half;
+          hi = st.zmid + half;
+        }
+        const scale = hi > lo ? 255 / (hi - lo) : 0;
+        const pal = st.palettes[st.colorscale];
+        const rgb = typeof pal === "string" ? (st.palettes[st.colorscale] = emlabB64Bytes(pal)) : pal;
+        const canvas = document.createElement("canvas");
+        canvas.width = cols;
+        canvas.height = rows;
+        const ctx = canvas.getContext("2d");
+        const img = ctx.createImageData(cols, rows);
+        const q = new Uint8Array(rows*cols);
+        for(let i=0;i<rows;i++){
+          const row = z[i];
+          for(let j=0;j<cols;j++){
+            const p = i*cols + j, k = Math.round((row[j] - lo) * scale);
+            q[p] = k;
+            img.data[4*p] = rgb[3*k];
+            img.data[4*p+1] = rgb[3*k+1];
+            img.data[4*p+2] = rgb[3*k+2];
+            img.data[4*p+3] = 255;
+          }
+        }
+        ctx.putImageData(img, 0, 0);
+        const reshape = rows !== st.rows || cols !== st.cols;
+        Object.assign(st, {q, lo, hi, rows, cols});
+        const update = {source: [canvas.toDataURL("image/png")]};
+        if(reshape) update.hovertext = [st.hover = emlabImageHover(st)];
+        const done = [Plotly.restyle(gd, update, [0])];
+        if(gd.data.length > 1){
+          const bar = {z: [[[lo, hi]]], zmin: [lo], zmax: [hi]};
+          if(style.colorscale !== undefined) bar.colorscale = [style.colorscale];
+          done.push(Plotly.restyle(gd, bar, [1]));
+        }
+        return Promise.all(done);
+      }
+      const emlabDataCache = {};
+      function emlabPrepareData(id){
+        // Inflate a compressed data block once ([u32 json length][json][raw arrays]);
+        // emlabGetJSON then parses from the cache.
         const el = document.getElementById(id);
-        if(!el) return {};
-        return JSON.parse(el.textContent);
+        if(!el || !el.dataset.encoding || emlabDataCache[id]) return Promise.resolve();
+        return emlabInflate(emlabB64Bytes(el.textContent.trim())).then(bytes => {
+          const n = new DataView(bytes.buffer, bytes.byteOffset, 4).getUint32(0, true);
+          emlabDataCache[id] = {
+            text: new TextDecoder().decode(bytes.subarray(4, 4 + n)),
+            raw: bytes.subarray(4 + n),
+          };
+        });
+      }
+      // data already decoded for a module's figures, handed to the module's first emlabGetJSON
+      const emlabDataShared = {};
+      function emlabGetJSON(id){
+        const shared = emlabDataShared[id];
+        if(shared){
+          delete emlabDataShared[id];
+          return shared;
+        }
+        let src = emlabDataCache[id];
+        if(!src){
+          const el = document.getElementById(id);
+          if(!el || el.dataset.encoding) return {};
+          src = {text: el.textContent, raw: null};
+        }
+        return JSON.parse(src.text, (k, v) => (v && typeof v === "object" && v.__nd__) ? emlabDecodeND(v, src.raw) : v);
       }
       function emlabNum(x){ return (typeof x === "number") ? x : parseFloat(x); }
       function emlabFmt(x, digits){
@@ -795,21 +1473,236 @@ TEMPLATE = Template(
         divs.forEach(d => { try{ Plotly.Plots.resize(d); }catch(e){} });
       }
 
+      {% if not lazy %}
       // ------- Module JS -------
       {{ modules_js|safe }}
+      {% endif %}
 
       // ------- Navigation + init -------
       const emlabModules = {{ module_ids|safe }};
+      // startup/hydration timings (ms since navigation start), for profiling on real devices;
+      // phases[id]: {load, data, figures, init} ms of that module's hydration
+      const emlabTiming = window.emlabTiming = {hydrate: {}, phases: {}};
+      const emlabHydrated = {};
+      // figures are created from the figs-<id> spec on first activation; see emlabCreateFigures
+      const emlabFigState = {};
+      const EMLAB_PURGE_AFTER_MS = {{ purge_after_ms }};
+      function emlabTrackHandlers(gd){
+        // Remember gd.on(...) registrations so a purged figure can get its handlers back.
+        if(!gd.on || gd.on.emlabTracked) return;
+        const on = gd.on;
+        gd.on = function(name, fn){
+          (gd.emlabHandlers = gd.emlabHandlers || []).push([name, fn]);
+          return on.call(this, name, fn);
+        };
+        gd.on.emlabTracked = true;
+      }
+      let emlabTemplates = null;
+      function emlabTemplate(name){
+        // Plotly templates are shipped once per page (#plotly-templates); figures and module JS
+        // refer to them by name and share one parsed object.
+        if(!emlabTemplates) emlabTemplates = JSON.parse(document.getElementById("plotly-templates").textContent);
+        return emlabTemplates[name];
+      }
+      function emlabResolveRefs(v, getData){
+        // {"__ref__": [key, i, ...]} -> that array of the module's data (shipped once; see figspec.ref)
+        if(!v || typeof v !== "object") return v;
+        if(Array.isArray(v)){
+          if(v.length && typeof v[0] === "object") for(let i=0;i<v.length;i++) v[i] = emlabResolveRefs(v[i], getData);
+          return v;
+        }
+        if(v.__ref__) return v.__ref__.reduce((o, k) => o[k], getData());
+        for(const k in v) v[k] = emlabResolveRefs(v[k], getData);
+        return v;
+      }
+      function emlabCreateFigures(id){
+        const src = document.getElementById("figs-"+id);
+        if(!src) return Promise.resolve();
+        const specs = JSON.parse(src.textContent);
+        src.remove();
+        let data = null;
+        // parsed at most once; handed on to the module's own emlabGetJSON call (see there)
+        const getData = () => data || (data = emlabDataShared["data-"+id] = emlabGetJSON("data-"+id));
+        specs.forEach(f => emlabResolveRefs(f.data, getData));
+        const divs = specs.map((_, i) => document.getElementById("fig-"+id+"-"+i));
+        emlabFigState[id] = {divs, configs: specs.map(f => f.config), saved: null, timer: null};
+        return Promise.all(specs.map((f, i) => {
+          const gd = divs[i];
+          if(!gd) return null;
+          if(typeof f.layout.template === "string") f.layout.template = emlabTemplate(f.layout.template);
+          emlabInitImage(gd, f.data);  // hover values arrive (inflated) shortly after the plot
+          return Plotly.newPlot(gd, f.data, f.layout, f.config).then(() => emlabTrackHandlers(gd));
+        }));
+      }
+      function emlabPurgeFigures(id){
+        // Drop the plots of a long-hidden module; the current traces/layout are kept for restore.
+        const st = emlabFigState[id];
+        if(!st || st.saved) return;
+        st.timer = null;
+        st.saved = st.divs.map(gd => gd && gd.data ? {data: gd.data, layout: gd.layout, handlers: gd.emlabHandlers || []} : null);
+        st.divs.forEach((gd, i) => { if(st.saved[i]){ Plotly.purge(gd); delete gd.emlabHandlers; } });
+      }
+      function emlabRestoreFigures(id){
+        const st = emlabFigState[id];
+        if(!st) return Promise.resolve();
+        if(st.timer){ clearTimeout(st.timer); st.timer = null; }
+        if(!st.saved) return Promise.resolve();
+        const saved = st.saved;
+        st.saved = null;
+        return Promise.all(st.divs.map((gd, i) => {
+          const f = saved[i];
+          if(!f) return null;
+          return Plotly.newPlot(gd, f.data, f.layout, st.configs[i]).then(() => {
+            emlabTrackHandlers(gd);
+            f.handlers.forEach(([name, fn]) => gd.on(name, fn));
+          });
+        }));
+      }
+      // split builds: module id -> "modules/<id>.<hash>.js" (figures, data and JS of that module),
+      // "<id>:<name>" -> "modules/<id>-<name>.<hash>.js" (one of its data_blocks)
+      const emlabChunks = {{ chunks_json|safe }};
+      function emlabLoadScript(src){
+        // <script src> injection rather than fetch(), so split builds also work from file://
+        return new Promise((resolve, reject) => {
+          const s = document.createElement("script");
+          s.src = src;
+          s.onload = () => resolve();
+          s.onerror = () => reject(new Error("EMLab: could not load "+src));
+          document.head.appendChild(s);
+        });
+      }
+      function emlabRegisterChunk(id, blocks){
+        // Called by a module chunk: recreate the figs-/data- blocks a single-file build inlines.
+        const sec = document.getElementById("section-"+id);
+        blocks.forEach(b => {
+          const el = document.createElement("script");
+          el.type = b.type;
+          el.id = b.id;
+          if(b.encoding) el.dataset.encoding = b.encoding;
+          el.textContent = b.text;
+          sec.appendChild(el);
+        });
+      }
+      function emlabHydrate(id){
+        // First activation: load the module's chunk (split builds) or evaluate its inert JS
+        // (lazy builds), decode its data, create its figures, init.
+        if(emlabHydrated[id]) return emlabHydrated[id];
+        const t0 = performance.now();
+        const phases = emlabTiming.phases[id] = {};
+        let mark = t0;
+        const lap = name => { const now = performance.now(); phases[name] = now - mark; mark = now; };
+        const chunk = emlabChunks[id] ? emlabLoadScript(emlabChunks[id]) : Promise.resolve();
+        emlabHydrated[id] = chunk.then(() => {
+          const src = document.getElementById("js-"+id);
+          if(src){
+            const s = document.createElement("script");
+            s.textContent = src.textContent;
+            document.head.appendChild(s);
+            src.remove();
+          }
+          lap("load");
+          // figures may take arrays from the module's data (figspec.ref), so decode it first
+          return emlabPrepareData("data-"+id);
+        }).then(() => {
+          lap("data");
+          return emlabCreateFigures(id);
+        }).then(() => {
+          lap("figures");
+          const fn = window["init_"+id];
+          if(typeof fn === "function") fn();
+          lap("init");
+          emlabTiming.hydrate[id] = performance.now() - t0;
+        }).catch(e => console.error("EMLab: init of "+id+" failed", e));
+        return emlabHydrated[id];
+      }
+      const emlabBlocks = {};
+      function emlabGetData(id, name){
+        // One of a module's data_blocks (extra payloads kept out of data-<id>), decoded on the first
+        // request; resolves to the same object afterwards.
+        const key = id+":"+name;
+        if(emlabBlocks[key]) return emlabBlocks[key];
+        const elId = "data-"+id+"-"+name;
+        const chunk = emlabChunks[key] ? emlabLoadScript(emlabChunks[key]) : Promise.resolve();
+        return emlabBlocks[key] = chunk.then(() => emlabPrepareData(elId)).then(() => {
+          const data = emlabGetJSON(elId);
+          const el = document.getElementById(elId);
+          if(el) el.remove();
+          delete emlabDataCache[elId];
+          return data;
+        });
+      }
       function emlabShow(moduleId){
         emlabModules.forEach(id => {
           const sec = document.getElementById("section-"+id);
           const btn = document.getElementById("nav-"+id);
+          const wasActive = sec ? sec.classList.contains("active") : false;
           if(sec) sec.classList.toggle("active", id === moduleId);
           if(btn) btn.classList.toggle("active", id === moduleId);
+          const st = emlabFigState[id];
+          if(EMLAB_PURGE_AFTER_MS > 0 && st && wasActive && id !== moduleId && !st.timer){
+            st.timer = setTimeout(() => emlabPurgeFigures(id), EMLAB_PURGE_AFTER_MS);
+          }
+        });
+        return emlabHydrate(moduleId)
+          .then(() => emlabRestoreFigures(moduleId))
+          .then(() => { setTimeout(emlabResizeActive, 80); });
+      }
+      // ------- Formula panels (lazy MathJax) -------
+      let emlabMathJaxLoad = null;
+      let emlabGlobalFormulas = null;
+      function emlabLoadMathJax(){
+        // Evaluate the inert MathJax source once; resolves false when the page has no MathJax.
+        if(emlabMathJaxLoad) return emlabMathJaxLoad;
+        const src = document.getElementById("mathjax-src");
+        const asset = {{ mathjax_src_json|safe }};
+        if(!src && !asset) return (emlabMathJaxLoad = Promise.resolve(false));
+        const t0 = performance.now();
+        const ready = new Promise(resolve => { window.emlabMathJaxReady = () => resolve(true); });
+        if(src){
+          const s = document.createElement("script");
+          s.textContent = src.textContent;
+          document.head.appendChild(s);
+          src.remove();
+          emlabMathJaxLoad = ready;
+        }else{
+          emlabMathJaxLoad = emlabLoadScript(asset).then(() => ready, e => { console.error(e); return false; });
+        }
+        emlabMathJaxLoad = emlabMathJaxLoad.then(ok => {
+          emlabTiming.mathjax = performance.now() - t0;
+          return ok;
         });
-        setTimeout(emlabResizeActive, 80);
+        return emlabMathJaxLoad;
+      }
+      function emlabFillGlobalFormulas(slot, typeset){
+        // The shared section is typeset in the first panel opened, later panels get a copy.
+        if(!emlabGlobalFormulas){
+          const tpl = document.getElementById("formula-global");
+          if(tpl) slot.appendChild(tpl.content.cloneNode(true));
+          emlabGlobalFormulas = (typeset ? MathJax.typesetPromise([slot]) : Promise.resolve()).then(() => slot);
+          return emlabGlobalFormulas;
+        }
+        return emlabGlobalFormulas.then(done => {
+          if(done === slot) return;
+          Array.from(done.childNodes).forEach(n => slot.appendChild(n.cloneNode(true)));
+        });
+      }
+      function emlabOpenFormulas(panel){
+        if(panel.dataset.typeset) return;
+        panel.dataset.typeset = "1";
+        emlabLoadMathJax().then(typeset => {
+          const jobs = [];
+          const slot = panel.querySelector(".formula-global");
+          if(slot) jobs.push(emlabFillGlobalFormulas(slot, typeset));
+          const body = panel.querySelector(".formula-body");
+          if(body && typeset) jobs.push(MathJax.typesetPromise([body]));
+          return Promise.all(jobs);
+        }).catch(e => console.error("EMLab: formula typesetting failed", e));
       }
+
       document.addEventListener("DOMContentLoaded", () => {
+        document.querySelectorAll("details.formula").forEach(panel => {
+          panel.addEventListener("toggle", () => { if(panel.open) emlabOpenFormulas(panel); });
+        });
         // attach nav
         emlabModules.forEach(id => {
           const btn = document.getElementById("nav-"+id);
@@ -828,83 +1721,571 @@ TEMPLATE = Template(
             Plotly.downloadImage(fig, {format:"png", filename:"emlab_"+id+"_"+ts, width: 1100, height: 700});
           });
         });
-        // init modules
-        emlabModules.forEach(id => {
-          const fn = window["init_"+id];
-          if(typeof fn === "function") fn();
-        });
-        // show first
-        if(emlabModules.length) emlabShow(emlabModules[0]);
+        emlabTiming.domContentLoaded = performance.now();
+        {% if not lazy %}
+        // eager build: init every module up front
+        emlabModules.forEach(emlabHydrate);
+        {% endif %}
+        // show first (lazy builds only hydrate this one)
+        if(emlabModules.length){
+          emlabShow(emlabModules[0]).then(() => {
+            emlabTiming.firstModuleReady = performance.now();
+            {% if debug %}
+            console.debug("EMLab startup timing (ms)", emlabTiming);
+            {% endif %}
+          });
+        }
         window.addEventListener("resize", () => setTimeout(emlabResizeActive, 100));
       });
     </script>
   </body>
 </html>"""
-)
+TEMPLATE = Template(_TEMPLATE_SRC)
 
 
-def build_site(*, mode: str = "release", no_ct: bool = False) -> str:
-    config = {
-        "responsive": True,
-        "displaylogo": False,
-        "modeBarButtonsToRemove": ["lasso2d", "select2d"],
-    }
+def _module_builders(
+    *, no_ct: bool = False, only: Iterable[str] | None = None, exclude: Iterable[str] = ()
+) -> list[Callable[[], dict[str, Any]]]:
+    """
+    Builders of the selected modules, in navigation order (see `emlab.registry`).
+
+    Only these modules are imported. `no_ct` is the historical spelling of `exclude=["xct_ct"]`.
+    """
+    exclude = [*exclude, "xct_ct"] if no_ct else list(exclude)
+    return [registry.builder(name) for name in registry.select(only=only, exclude=exclude)]
 
-    module_builders: list[Callable[[], dict[str, Any]]] = [
-        crt_scope.build,
-        xct_ct.build,
-        ac_motor.build,
-        rail_launcher.build,
-        mass_spec.build,
-        electron_microscope.build,
-        cyclotron.build,
-        linac.build,
-        transformer.build,
-        rlc_oscillation.build,
-        wireless_power.build,
-        hall_effect.build,
-        speaker_microphone.build,
-        induction_heating.build,
-    ]
-    if no_ct:
-        module_builders = [b for b in module_builders if getattr(b, "__module__", "") != xct_ct.__name__]
 
-    module_dicts = [b() for b in module_builders if b is not None]
+def _startup_report(modules: list[ModuleBundle]) -> dict[str, Any]:
+    """
+    What the page has to parse/decode/init before the first module is interactive, eager vs lazy.
+
+    Byte and figure counts, not timings: those depend on the device, and the page records them
+    itself in `window.emlabTiming` (per-module load/data/figures/init phases, first module ready).
+    """
+
+    def work(ms: list[ModuleBundle]) -> dict[str, int]:
+        return {
+            "modules_initialized": len(ms),
+            "js_bytes": sum(nbytes(m.js) for m in ms),
+            "data_bytes": sum(nbytes(m.data_json) for m in ms),
+            # data_blocks: shipped, but only decoded on request
+            "deferred_data_bytes": sum(nbytes(text) for m in ms for _, text in m.data_blocks),
+            "figures_created": sum(len(m.figure_ids) for m in ms),
+            "figure_spec_bytes": sum(nbytes(m.figures_json) for m in ms),
+        }
+
+    return {"eager": work(modules), "lazy": work(modules[:1])}
+
+
+def _drain(modules: list[ModuleBundle], formulas_html: dict[str, str]) -> Iterator[ModuleBundle]:
+    """
+    Yield the bundles in order, removing each from `modules` first.
+
+    The template writes a module's section and moves on, so once the caller holds no other
+    reference a streamed build only keeps one module's HTML/payload alive at a time.
+    """
+    modules.reverse()
+    while modules:
+        bundle = modules.pop()
+        yield _attach_formulas(bundle, formulas_html) if formulas_html else bundle
+
+
+@lru_cache(maxsize=None)
+def _minified_template_src() -> str:
+    """TEMPLATE source with its CSS and inline scripts minified (Jinja tags survive)."""
+    src = re.sub(r"(<style>)(.*?)(</style>)", lambda m: m[1] + minify_css(m[2]) + m[3], _TEMPLATE_SRC, flags=re.S)
+    return re.sub(r"(<script>)(?!\{%)(.*?)(</script>)", lambda m: m[1] + minify_js(m[2]) + m[3], src, flags=re.S)
+
+
+@lru_cache(maxsize=None)
+def _minified_template() -> Template:
+    return Template(_minified_template_src())
+
+
+def _page_template(mode: str) -> Template:
+    return _minified_template() if mode == "release" else TEMPLATE
+
+
+def _site_context(
+    modules: list[ModuleBundle],
+    *,
+    mode: str = "release",
+    hydrate: str = "lazy",
+    purge_after: float = 0.0,
+    split_dir: Path | None = None,
+    profiler: BuildProfiler | None = None,
+) -> dict[str, Any]:
+    """
+    Template context for the page (formulas, MathJax, Plotly, module sections).
+
+    `modules` is consumed while the template renders (see `_drain`). With `split_dir` (the
+    `--layout split` output directory) Plotly, MathJax and one chunk per module are written there
+    as content-hashed files and the page only references them.
+    """
     formulas_html = _load_formulas_html()
-    mathjax_inline = _load_mathjax_inline() if formulas_html else None
-    global_html = (formulas_html.get("_global") or "").strip()
-    if formulas_html:
-        for md in module_dicts:
-            mid = md.get("id", "")
-            body_html = (formulas_html.get(mid) or "").strip()
-            if not (global_html or body_html):
-                continue
-            parts: list[str] = ['<details class="formula">', "<summary>公式推演（展开）</summary>"]
-            if global_html:
-                parts.append(f'<div class="formula-global tex2jax_process">{global_html}</div>')
-            if body_html:
-                parts.append(f'<div class="formula-body tex2jax_process">{body_html}</div>')
-            parts.append("</details>")
-            md["intro_html"] = (md.get("intro_html", "") or "") + "\n" + "\n".join(parts)
-    modules = [_bundle(md, config=config) for md in module_dicts]
-
-    modules_js = "\n\n".join(m.js for m in modules if m.js)
-    module_ids = [m.id for m in modules]
-
-    plotly_inline = get_plotlyjs() if mode == "release" else None
-    plotly_cdn_src = None
-    if mode != "release":
+    mathjax_path = _mathjax_path() if formulas_html else None
+    formula_global_html = (formulas_html.get("_global") or "").strip()
+    if formulas_html and profiler is not None:
+        panels = sum(1 for m in modules if formula_global_html or formulas_html.get(m.id))
+        profiler.section("formulas").update(
+            panels=panels,
+            global_html_bytes=nbytes(formula_global_html),
+            bytes_saved=nbytes(formula_global_html) * max(0, panels - 1),
+        )
+
+    # lazy pages keep each module's JS inert until first use; split pages load it with the chunk
+    inline_js = hydrate != "lazy" and split_dir is None
+    modules_js = "\n\n".join(m.js for m in modules if m.js) if inline_js else ""
+    nav = [(m.id, m.title) for m in modules]
+
+    trace_types: set[str] = set()
+    template_names: set[str] = set()
+    for m in modules:
+        trace_types |= plotlyjs.figure_trace_types(m.figures_json) | plotlyjs.js_trace_types(m.js)
+        template_names |= _template_names(m)
+    # each template once per page (figures and module JS refer to it by name)
+    templates_json = _dumps({name: figspec.template(name) for name in sorted(template_names)})
+    if profiler is not None:
+        profiler.section("templates").update(_templates_report(modules, templates_json))
+    plotly_inline = None
+    plotly_src = None
+    if mode == "release":
+        # Fully offline: the smallest vendored partial bundle that has every trace type we use.
+        plotly = plotlyjs.resolve(trace_types)
+        if split_dir is not None:
+            stem = "plotly" if plotly.bundle == "full" else f"plotly-{plotly.bundle}"
+            plotly_src = _write_hashed(split_dir, f"assets/{stem}", ".min.js", plotly.chunks())
+        else:
+            plotly_inline = plotly.chunks()
+        if profiler is not None:
+            profiler.assets["plotly_js"] = plotly.nbytes()
+            profiler.section("plotly_js").update(plotly.report())
+    else:
         # Keep debug small by using CDN, but match the bundled plotly.js version.
-        js_head = get_plotlyjs()[:120]
-        m = re.search(r"plotly\.js v(\d+\.\d+\.\d+)", js_head)
-        ver = m.group(1) if m else "latest"
-        plotly_cdn_src = f"https://cdn.plot.ly/plotly-{ver}.min.js"
-    return TEMPLATE.render(
-        modules=modules,
-        module_ids=_dumps(module_ids),
+        plotly_src = plotlyjs.cdn_src(trace_types)
+    if profiler is not None:
+        profiler.assets["mathjax_js"] = mathjax_path.stat().st_size if mathjax_path else 0
+    mathjax_src = None
+    chunks: dict[str, str] = {}
+    if split_dir is not None:
+        written = [plotly_src] if plotly_inline is None and mode == "release" else []
+        if mathjax_path is not None:
+            mathjax_src = _write_hashed(split_dir, "assets/tex-svg", ".js", _text_chunks(mathjax_path))
+            written.append(mathjax_src)
+            mathjax_path = None
+        for m in modules:
+            chunks[m.id] = _write_hashed(split_dir, f"modules/{m.id}", ".js", [_module_chunk(m)])
+            written.append(chunks[m.id])
+            for name, text in m.data_blocks:
+                key = f"{m.id}:{name}"
+                chunks[key] = _write_hashed(split_dir, f"modules/{m.id}-{name}", ".js", [_block_chunk(m, name, text)])
+                written.append(chunks[key])
+        _remove_stale(split_dir, set(written))
+        if profiler is not None:
+            profiler.section("split").update({name: (split_dir / name).stat().st_size for name in written})
+    if profiler is not None:
+        profiler.assets.setdefault("plotly_js", 0)
+        profiler.section("startup_work").update(hydrate=hydrate, **_startup_report(modules))
+    return dict(
+        nav=nav,
+        modules=_drain(modules, formulas_html),
+        module_ids=_dumps([module_id for module_id, _ in nav]),
         modules_js=modules_js,
+        lazy=hydrate == "lazy",
+        debug=mode == "debug",
+        purge_after_ms=int(purge_after * 1000),
         plotly_inline=plotly_inline,
-        plotly_cdn_src=plotly_cdn_src,
-        mathjax_inline=mathjax_inline,
+        plotly_src=plotly_src,
+        mathjax_inline=_text_chunks(mathjax_path) if mathjax_path else None,
+        mathjax_src=mathjax_src,
+        mathjax_src_json=_dumps(mathjax_src),
+        chunks=chunks,
+        chunks_json=_dumps(chunks),
+        templates_json=templates_json,
+        formula_global_html=formula_global_html,
         build_time=datetime.now().strftime("%Y-%m-%d %H:%M"),
     )
+
+
+def _write_hashed(root: Path, stem: str, suffix: str, chunks: Iterable[str]) -> str:
+    """
+    Write `chunks` to `root/<stem>.<hash><suffix>` and return that path relative to `root`.
+
+    The name changes only with the content, so browsers can keep unchanged files across releases.
+    """
+    tmp = root / f"{stem}.tmp{os.getpid()}{suffix}"
+    tmp.parent.mkdir(parents=True, exist_ok=True)
+    h = hashlib.sha256()
+    try:
+        with tmp.open("wb") as f:
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                h.update(data)
+                f.write(data)
+        name = f"{stem}.{h.hexdigest()[:12]}{suffix}"
+        os.replace(tmp, root / name)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return name
+
+
+# names `_write_hashed` gives .js files: `<stem>.<12 hex>.js` / `<stem>.<12 hex>.min.js`
+_HASHED_JS_RE = re.compile(r"[\w.-]+\.[0-9a-f]{12}(\.min)?\.js")
+
+
+def _remove_stale(root: Path, keep: set[str]) -> None:
+    """
+    Drop files from earlier split builds that the new index.html no longer references.
+
+    Only hashed names `_write_hashed` produces are touched, so other files under the output
+    directory survive.
+    """
+    for sub in ("assets", "modules"):
+        for path in (root / sub).glob("*.js"):
+            if _HASHED_JS_RE.fullmatch(path.name) and path.relative_to(root).as_posix() not in keep:
+                path.unlink()
+
+
+def _data_block(element_id: str, text: str, encoding: str) -> dict[str, str]:
+    if encoding == "json":
+        return {"id": element_id, "type": "application/json", "text": text}
+    return {"id": element_id, "type": "application/octet-stream", "encoding": encoding, "text": text}
+
+
+def _register_chunk(module_id: str, blocks: list[dict[str, str]]) -> str:
+    # ensure_ascii keeps U+2028/2029 and friends out of the JS source
+    register = json.dumps(blocks, ensure_ascii=True, separators=(",", ":")).replace("</", "<\\/")
+    return f"emlabRegisterChunk({json.dumps(module_id)}, {register});\n"
+
+
+def _module_chunk(bundle: ModuleBundle) -> str:
+    """
+    `modules/<id>.js` of a split build: registers the module's figs-/data- blocks with the page,
+    then defines `init_<id>` exactly like the inline module JS of a single-file build.
+    """
+    blocks = [
+        {"id": f"figs-{bundle.id}", "type": "application/json", "text": bundle.figures_json},
+        _data_block(f"data-{bundle.id}", bundle.data_json, bundle.data_encoding),
+    ]
+    return f"{_register_chunk(bundle.id, blocks)}{bundle.js}\n"
+
+
+def _block_chunk(bundle: ModuleBundle, name: str, text: str) -> str:
+    """`modules/<id>-<name>.js`: one of the module's `data_blocks`, loaded when the page asks for it."""
+    return _register_chunk(bundle.id, [_data_block(f"data-{bundle.id}-{name}", text, bundle.data_encoding)])
+
+
+def _render_site(modules: list[ModuleBundle], **kwargs: Any) -> str:
+    """The whole page as one string (consumes `modules`; see `_site_context`)."""
+    template = _page_template(kwargs.get("mode", "release"))
+    return template.render(**_site_context(modules, **kwargs))
+
+
+def _write_site(
+    modules: list[ModuleBundle], out_path: str | Path, *, layout: str = "single", **kwargs: Any
+) -> Path:
+    """
+    Stream the page to disk chunk by chunk instead of rendering one big string; returns its path.
+
+    `layout="single"`: one self-contained HTML file at `out_path`. `layout="split"`: `out_path` is
+    a directory that receives `index.html` plus the hashed assets and module chunks.
+    The page is written to a temporary file and renamed, so a failed build never leaves a
+    truncated page behind.
+    """
+    out_path = Path(out_path)
+    if layout == "split":
+        out_path.mkdir(parents=True, exist_ok=True)
+        kwargs["split_dir"] = out_path
+        out_path = out_path / "index.html"
+    tmp = out_path.with_name(f".{out_path.name}.tmp{os.getpid()}")
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            _page_template(kwargs.get("mode", "release")).stream(**_site_context(modules, **kwargs)).dump(f)
+        os.replace(tmp, out_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return out_path
+
+
+def _peak(fn: Callable[[], Any]) -> tuple[Any, int]:
+    """`fn()` and the tracemalloc peak while it ran."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _write_site_measured(
+    modules: list[ModuleBundle], out_path: str | Path, *, profiler: BuildProfiler, **kwargs: Any
+) -> Path:
+    """
+    `_write_site` with a "memory" report: tracemalloc peak of rendering the page as one string
+    (and encoding it, as `write_text` does) vs the streamed write itself. Only the streamed
+    write touches `out_path`; the string is rendered from a copy of the bundle list and dropped.
+    """
+    with phase(profiler, "measure_render_memory"):
+        _, string_peak = _peak(
+            lambda: _render_site(list(modules), profiler=profiler, **kwargs).encode("utf-8")
+        )
+    with phase(profiler, "render_write"):
+        path, stream_peak = _peak(lambda: _write_site(modules, out_path, profiler=profiler, **kwargs))
+    profiler.section("memory").update(
+        render_peak_bytes={"string": string_peak, "stream": stream_peak},
+        reduction_bytes=string_peak - stream_peak,
+    )
+    return path
+
+
+def _build_bundles(
+    *,
+    no_ct: bool = False,
+    only: Iterable[str] | None = None,
+    exclude: Iterable[str] = (),
+    payload: str = "binary",
+    compress: bool = False,
+    minify: bool = False,
+    validate_figures: bool = False,
+    jobs: int = 1,
+    cache_dir: str | Path | None = None,
+    cache_max_bytes: int = DEFAULT_MAX_BYTES,
+    profiler: BuildProfiler | None = None,
+) -> list[ModuleBundle]:
+    options = BundleOptions(
+        payload=payload, compress=compress, minify=minify, validate_figures=validate_figures
+    )
+    cache = BuildCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir is not None else None
+    with phase(profiler, "build_modules"):
+        return _build_modules(
+            _module_builders(no_ct=no_ct, only=only, exclude=exclude),
+            options=options,
+            jobs=jobs,
+            cache=cache,
+            profiler=profiler,
+        )
+
+
+def build_site(
+    *,
+    mode: str = "release",
+    hydrate: str = "lazy",
+    purge_after: float = 0.0,
+    profiler: BuildProfiler | None = None,
+    **build_kwargs: Any,
+) -> str:
+    """Build every module and return the page as one string (see `write_site` for large pages)."""
+    modules = _build_bundles(
+        minify=mode == "release", validate_figures=mode == "debug", profiler=profiler, **build_kwargs
+    )
+    with phase(profiler, "render"):
+        return _render_site(modules, mode=mode, hydrate=hydrate, purge_after=purge_after, profiler=profiler)
+
+
+def write_site(
+    out_path: str | Path,
+    *,
+    mode: str = "release",
+    layout: str = "single",
+    hydrate: str = "lazy",
+    purge_after: float = 0.0,
+    profiler: BuildProfiler | None = None,
+    **build_kwargs: Any,
+) -> Path:
+    """
+    Build every module and stream the page into `out_path`; returns the HTML file written.
+
+    Accepts the same options as `build_site`, plus `layout` (see `_write_site`). Module sections
+    are written and released one at a time, so peak memory no longer holds the whole page (plus
+    its encoded copy) at once; with a profiler the report gets a "memory" section comparing both
+    render paths (single-file layout).
+    """
+    modules = _build_bundles(
+        minify=mode == "release", validate_figures=mode == "debug", profiler=profiler, **build_kwargs
+    )
+    render_kwargs = dict(mode=mode, hydrate=hydrate, purge_after=purge_after)
+    if profiler is not None and mode == "release":
+        saved = [m["minify_saved_bytes"] for m in profiler.modules if "minify_saved_bytes" in m]
+        profiler.section("minify").update(
+            template_bytes_saved=nbytes(_TEMPLATE_SRC) - nbytes(_minified_template_src()),
+            modules_bytes_saved=sum(d["js"] + d["html"] for d in saved),
+        )
+    if profiler is not None:
+        profiler.section("figure_refs").update(
+            {m["id"]: m["figure_refs_saved_bytes"] for m in profiler.modules if m["figure_refs_saved_bytes"]},
+            total_bytes_saved=sum(m["figure_refs_saved_bytes"] for m in profiler.modules),
+        )
+    if profiler is not None and layout == "single":
+        return _write_site_measured(modules, out_path, profiler=profiler, **render_kwargs)
+    with phase(profiler, "render_write"):
+        return _write_site(modules, out_path, layout=layout, profiler=profiler, **render_kwargs)
+
+
+# `build.py --variants`: the `write_site` options each named variant sets. Variants are written
+# under one output directory as `emlab.html` (release) and `emlab-<name>.html` (the others), or
+# the same names as directories with `--layout split`.
+VARIANTS: dict[str, dict[str, Any]] = {
+    "release": {"mode": "release"},
+    "debug": {"mode": "debug"},
+    "no-ct": {"mode": "release", "no_ct": True},
+}
+
+
+def parse_variants(text: str) -> list[str]:
+    """`"release,no-ct"` -> `["release", "no-ct"]`; ValueError for unknown or repeated names."""
+    names = [n.strip() for n in text.split(",") if n.strip()]
+    unknown = [n for n in names if n not in VARIANTS]
+    if unknown:
+        raise ValueError(f"unknown variant(s): {', '.join(unknown)} (choose from {', '.join(VARIANTS)})")
+    if len(set(names)) != len(names):
+        raise ValueError(f"variant listed twice: {text}")
+    if not names:
+        raise ValueError("no variants given")
+    return names
+
+
+def variant_path(out_dir: str | Path, name: str, *, layout: str = "single") -> Path:
+    stem = "emlab" if name == "release" else f"emlab-{name}"
+    return Path(out_dir) / (stem if layout == "split" else f"{stem}.html")
+
+
+def _build_module_variants(
+    builder: Callable[[], dict[str, Any]], options_list: list[BundleOptions]
+) -> tuple[list[ModuleBundle], PhaseTimer]:
+    """Run one module builder once and render its bundle for each of `options_list`."""
+    timer = PhaseTimer()
+    with timer.phase("build", module=builder.__module__):
+        module_dict = builder()
+    bundles = []
+    for options in options_list:
+        with timer.phase("bundle", module=builder.__module__):
+            bundles.append(_bundle(module_dict, options=options))
+    return bundles, timer
+
+
+def write_variants(
+    out_dir: str | Path,
+    variants: list[str],
+    *,
+    layout: str = "single",
+    no_ct: bool = False,
+    only: Iterable[str] | None = None,
+    exclude: Iterable[str] = (),
+    payload: str = "binary",
+    compress: bool = False,
+    hydrate: str = "lazy",
+    purge_after: float = 0.0,
+    jobs: int = 1,
+    cache_dir: str | Path | None = None,
+    cache_max_bytes: int = DEFAULT_MAX_BYTES,
+    profiler: BuildProfiler | None = None,
+) -> dict[str, Any]:
+    """
+    Write several `VARIANTS` of the page from one set of module builds; returns the report.
+
+    Each selected module's `build()` runs once; its dict is rendered into one `ModuleBundle` per
+    distinct set of `BundleOptions` the variants need (release and no-ct share theirs), and every
+    variant page is written from those shared bundles. The report gives each variant's path and
+    size, and `saved_s`: the module `build()`/bundle time that separate `build.py` invocations
+    would have spent again (so `separate_s` = this run's wall time + `saved_s`). As with
+    `write_site`, a profiler disables cache reads so every module is measured.
+    """
+    t_start = time.perf_counter()
+    plans = []  # (variant, options, option key, module names)
+    for name in variants:
+        settings = VARIANTS[name]
+        mode = settings["mode"]
+        options = BundleOptions(
+            payload=payload, compress=compress, minify=mode == "release", validate_figures=mode == "debug"
+        )
+        skip = [*exclude, "xct_ct"] if no_ct or settings.get("no_ct") else list(exclude)
+        key = json.dumps(asdict(options), sort_keys=True)
+        plans.append((name, options, key, registry.select(only=only, exclude=skip)))
+
+    # module -> the distinct options its variants need, in registration order
+    needed: dict[str, dict[str, BundleOptions]] = {}
+    for _, options, key, names in plans:
+        for module in names:
+            needed.setdefault(module, {})[key] = options
+    needed = {m: needed[m] for m in registry.MODULES if m in needed}
+    builders = {m: registry.builder(m) for m in needed}
+
+    cache = BuildCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir is not None else None
+    bundles: dict[tuple[str, str], ModuleBundle] = {}
+    cache_keys: dict[tuple[str, str], str] = {}
+    for module, opts in needed.items():
+        for key, options in opts.items():
+            if cache is not None:
+                cache_keys[module, key] = cache.key(builders[module], asdict(options))
+                hit = cache.get(cache_keys[module, key]) if profiler is None else None
+                if hit is not None:
+                    bundles[module, key] = hit
+    todo = {m: [k for k in opts if (m, k) not in bundles] for m, opts in needed.items()}
+    todo = {m: keys for m, keys in todo.items() if keys}
+
+    with phase(profiler, "build_modules"):
+        args = [(builders[m], [needed[m][k] for k in keys]) for m, keys in todo.items()]
+        if jobs <= 0:
+            jobs = os.cpu_count() or 1
+        jobs = min(jobs, len(args))
+        if jobs <= 1:
+            built = [_build_module_variants(*a) for a in args]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=jobs) as ex:
+                built = list(ex.map(_build_module_variants, *zip(*args)))
+
+    module_s: dict[str, float] = {}
+    bundle_s: dict[tuple[str, str], float] = {}
+    for (module, keys), (results, timer) in zip(todo.items(), built):
+        module_s[module] = timer.durations["build"]
+        bundle_durations = [e["dur"] / 1e6 for e in timer.events if e["name"] == "bundle"]
+        for key, bundle, dur in zip(keys, results, bundle_durations):
+            bundles[module, key] = bundle
+            bundle_s[module, key] = dur
+            if cache is not None:
+                cache.put(cache_keys[module, key], bundle)
+        if profiler is not None:
+            profiler.events.extend(timer.events)
+    if cache is not None:
+        cache.evict()
+
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    report: dict[str, Any] = {"variants": {}}
+    separate = 0.0  # module work N separate invocations would do
+    for name, _, key, names in plans:
+        path = variant_path(out_dir, name, layout=layout)
+        t0 = time.perf_counter()
+        with phase(profiler, "render_write", variant=name):
+            written = _write_site(
+                [bundles[m, key] for m in names],
+                path,
+                layout=layout,
+                mode=VARIANTS[name]["mode"],
+                hydrate=hydrate,
+                purge_after=purge_after,
+            )
+        # a separate invocation runs build() for every module it does not find in the cache
+        separate += sum(module_s[m] + bundle_s[m, key] for m in names if (m, key) in bundle_s)
+        report["variants"][name] = {
+            "path": str(written),
+            "modules": len(names),
+            "bytes": written.stat().st_size,
+            "render_write_s": round(time.perf_counter() - t0, 4),
+        }
+    shared = sum(module_s.values()) + sum(bundle_s.values())
+    actual = time.perf_counter() - t_start
+    report.update(
+        modules_built=len(module_s),
+        bundles_built=len(bundle_s),
+        bundles_cached=sum(len(opts) for opts in needed.values()) - len(bundle_s),
+        module_build_s=round(sum(module_s.values()), 4),
+        bundle_s=round(sum(bundle_s.values()), 4),
+        actual_s=round(actual, 4),
+        separate_s=round(actual + separate - shared, 4),
+        saved_s=round(separate - shared, 4),
+    )
+    if profiler is not None:
+        profiler.section("variants").update(report)
+    return report
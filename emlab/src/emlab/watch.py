@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import importlib
+import sys
+import time
+import traceback
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Iterable
+
+from emlab.buildcache import DEFAULT_MAX_BYTES
+
+PKG = Path(__file__).resolve().parent
+REPO_ROOT = PKG.parents[2]
+FORMULAS = REPO_ROOT / "formulas.md"
+
+
+def _watched_files() -> dict[Path, float]:
+    paths = list(PKG.rglob("*.py"))
+    if FORMULAS.exists():
+        paths.append(FORMULAS)
+    out: dict[Path, float] = {}
+    for p in paths:
+        try:
+            out[p] = p.stat().st_mtime
+        except FileNotFoundError:
+            continue
+    return out
+
+
+def _module_name(path: Path) -> str | None:
+    """`modules/<name>.py` -> `emlab.modules.<name>`; None for shared code."""
+    rel = path.relative_to(PKG)
+    if len(rel.parts) == 2 and rel.parts[0] == "modules" and rel.stem != "__init__":
+        return f"emlab.modules.{rel.stem}"
+    return None
+
+
+def _fresh_site() -> ModuleType:
+    """Drop every emlab module from sys.modules and import the site renderer again."""
+    for name in list(sys.modules):
+        if name == "emlab" or name.startswith("emlab."):
+            del sys.modules[name]
+    return importlib.import_module("emlab.site")
+
+
+def watch(
+    out_path: Path,
+    *,
+    mode: str = "release",
+    layout: str = "single",
+    no_ct: bool = False,
+    only: list[str] | None = None,
+    exclude: Iterable[str] = (),
+    payload: str = "binary",
+    compress: bool = False,
+    hydrate: str = "lazy",
+    purge_after: float = 0.0,
+    jobs: int = 1,
+    cache_dir: str | Path | None = None,
+    cache_max_bytes: int = DEFAULT_MAX_BYTES,
+    interval: float = 0.5,
+) -> None:
+    """
+    Rebuild `out_path` whenever sources change.
+
+    - `modules/<name>.py`: reload that module and rebuild only its bundle
+    - `formulas.md`: re-render the page from the bundles already in memory
+    - anything else (`site.py`, `common/`, ...): full rebuild
+    """
+    site = _fresh_site()
+
+    def options() -> Any:
+        return site.BundleOptions(
+            payload=payload, compress=compress, minify=mode == "release", validate_figures=mode == "debug"
+        )
+
+    def make_cache() -> Any:
+        if cache_dir is None:
+            return None
+        return sys.modules["emlab.buildcache"].BuildCache(cache_dir, max_bytes=cache_max_bytes)
+
+    def full_build() -> dict[str, Any]:
+        builders = site._module_builders(no_ct=no_ct, only=only, exclude=exclude)
+        bundles = site._build_modules(builders, options=options(), jobs=jobs, cache=make_cache())
+        return {b.__module__: m for b, m in zip(builders, bundles)}
+
+    def write(bundles: dict[str, Any]) -> None:
+        site._write_site(
+            list(bundles.values()), out_path, layout=layout, mode=mode, hydrate=hydrate, purge_after=purge_after
+        )
+
+    t0 = time.perf_counter()
+    bundles = full_build()
+    write(bundles)
+    print(f"Wrote {out_path} ({time.perf_counter() - t0:.2f}s); watching for changes, Ctrl-C to stop")
+
+    seen = _watched_files()
+    while True:
+        try:
+            time.sleep(interval)
+        except KeyboardInterrupt:
+            print()
+            return
+        now = _watched_files()
+        changed = sorted(p for p in now.keys() | seen.keys() if now.get(p) != seen.get(p))
+        seen = now
+        if not changed:
+            continue
+
+        t0 = time.perf_counter()
+        module_names = [_module_name(p) for p in changed if p != FORMULAS]
+        try:
+            if any(name is None for name in module_names):
+                site = _fresh_site()
+                bundles = full_build()
+                what = "full rebuild"
+            else:
+                rebuilt = []
+                for name in module_names:
+                    if name not in bundles:
+                        continue  # not registered, or not selected (--only/--exclude/--no-ct)
+                    mod = importlib.reload(sys.modules[name])
+                    (bundles[name],) = site._build_modules(
+                        [mod.build], options=options(), cache=make_cache()
+                    )
+                    rebuilt.append(name.rsplit(".", 1)[-1])
+                what = ", ".join(rebuilt) if rebuilt else "re-render"
+            write(bundles)
+        except Exception:
+            traceback.print_exc()
+            print("Build failed; keeping the previous output, still watching.")
+            continue
+        rel = ", ".join(str(p.relative_to(REPO_ROOT)) for p in changed)
+        print(f"[{time.strftime('%H:%M:%S')}] {rel} -> {what} in {time.perf_counter() - t0:.2f}s")